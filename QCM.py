@@ -5,10 +5,28 @@ import os
 import ctypes
 import re
 import random
+import sys
 import wave
-import struct
+import warnings
 import tempfile  # Pour créer le fichier son temporaire
+import threading
+from array import array
 import backend
+import instrumentation
+from search_index import SearchIndex, fold
+
+# Mise à l'échelle des échantillons : NumPy est la voie prise en charge (seule voie rapide à partir
+# de Python 3.13) ; audioop, obsolète et retiré en 3.13, ne sert que de solution d'attente avant.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop
+except ImportError:
+    audioop = None
 
 import platform  
 import subprocess 
@@ -21,6 +39,111 @@ RESULT_FONT = ("Arial", 18)
 # --- CONFIGURATION ---
 SHOW_DEBUG_BUTTON = False   # Mettre False pour cacher le bouton de test
 DEFAULT_VOLUME = 0.3       # 0.1 = 10% du volume (Recommandé car WAV souvent très fort)
+CHAPTER_LIST_HEIGHT = 15  # Nb de lignes visibles de la liste des chapitres
+CHECK_ON, CHECK_OFF = "☑", "☐"
+SEARCH_DISPLAY_LIMIT = 200 # Nb max de résultats de recherche affichés (le QCM utilise tous les résultats)
+SEARCH_INDEX_SLICE = 0.03  # Durée max (s) d'une tranche d'indexation entre deux événements de l'interface
+
+# Rôles de thème des widgets tk classiques (les widgets ttk suivent les styles)
+THEME_ROLES = {
+    "frame": lambda t: {"bg": t['bg']},
+    "label": lambda t: {"bg": t['bg'], "fg": t['fg']},
+    "canvas": lambda t: {"bg": t['canvas']},
+    "checkbutton": lambda t: {"bg": t['bg'], "fg": t['fg'], "activebackground": t['bg'],
+                              "activeforeground": t['fg'], "selectcolor": t['bg']},
+    "flat_button": lambda t: {"bg": t['bg'], "activebackground": t['bg']},
+    "toolbar_button": lambda t: {"bg": t['toolbar'], "fg": t['fg'],
+                                 "activebackground": t['toolbar'], "activeforeground": t['fg']},
+}
+
+def scale_pcm16(frames, volume):
+    """Multiplie des échantillons PCM 16 bits (little-endian) par le volume.
+
+    Rapide (sans objet Python par échantillon) uniquement avec NumPy, ou audioop avant Python 3.13.
+    Sans les deux, c'est l'ancienne boucle Python, lente : installer NumPy (pip install numpy)."""
+    if numpy is not None:
+        samples = numpy.frombuffer(frames, dtype='<i2')
+        return (samples * volume).astype('<i2').tobytes()
+    if audioop is not None:
+        return audioop.mul(frames, 2, volume)
+    # Dernier recours = ancien chemin lent (un objet Python par échantillon), ex : Python 3.13+ sans NumPy
+    samples = array('h')
+    samples.frombytes(frames)
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    scaled = array('h', [int(s * volume) for s in samples])
+    if sys.byteorder == 'big':
+        scaled.byteswap()
+    return scaled.tobytes()
+
+class AssetManager:
+    """Index des images/sons de l'écran de score, construit une seule fois au démarrage.
+
+    Les fichiers "score_XX[_-.]...(png/jpg/gif)" sont rangés par palier XX, chacun
+    associé au .wav de même nom s'il existe. Le candidat du palier probable est tiré
+    au sort et décodé à l'avance, pendant les temps morts du quiz.
+    """
+    IMAGE_PATTERN = re.compile(r'^score_(\d+)(?:[._-].*)?$')
+    IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif')
+
+    def __init__(self, base_dir):
+        self.img_dir = os.path.join(base_dir, "Assets", "Images")
+        self.snd_dir = os.path.join(base_dir, "Assets", "Sounds")
+        self.index = self.scan()
+        self.chosen = {}   # palier -> (image, son) tiré pour le prochain affichage
+        self.images = {}   # chemin -> PhotoImage décodée
+        self.pending_decodes = set()
+
+    def scan(self):
+        sounds = set(os.listdir(self.snd_dir)) if os.path.isdir(self.snd_dir) else set()
+        index = {}
+        if os.path.isdir(self.img_dir):
+            for filename in sorted(os.listdir(self.img_dir)):
+                match = self.IMAGE_PATTERN.match(filename)
+                if not match or not filename.lower().endswith(self.IMAGE_EXTENSIONS):
+                    continue
+                base_name = os.path.splitext(filename)[0]
+                wav_name = f"{base_name}.wav"
+                wav_path = os.path.join(self.snd_dir, wav_name) if wav_name in sounds else None
+                index.setdefault(int(match.group(1)), []).append((os.path.join(self.img_dir, filename), wav_path))
+        return index
+
+    def choose(self, bracket):
+        """Tire (une fois) le couple image/son du palier, ou None s'il n'y en a pas"""
+        if bracket not in self.chosen:
+            candidates = self.index.get(bracket)
+            if not candidates:
+                return None
+            self.chosen[bracket] = random.choice(candidates)
+        return self.chosen[bracket]
+
+    def take(self, bracket):
+        """Couple à afficher maintenant ; le prochain affichage de ce palier fera un nouveau tirage"""
+        chosen = self.choose(bracket)
+        self.chosen.pop(bracket, None)
+        return chosen
+
+    def prefetch(self, bracket, app):
+        """Prépare l'image (décodée quand Tk est inactif) et le son du palier"""
+        chosen = self.choose(bracket)
+        if chosen is None:
+            return
+        img_path, wav_path = chosen
+        if img_path not in self.images and img_path not in self.pending_decodes:
+            self.pending_decodes.add(img_path)
+            app.after_idle(self.get_image, img_path)
+        if wav_path and app.volume_level < 0.99:
+            app.persistence.submit(("sound", wav_path), app.create_volume_adjusted_file, wav_path, app.volume_level)
+
+    def get_image(self, img_path):
+        self.pending_decodes.discard(img_path)
+        if img_path not in self.images:
+            try:
+                self.images[img_path] = tk.PhotoImage(file=img_path)
+            except Exception as e:
+                print(f"Erreur chargement Image: {e}")
+                self.images[img_path] = None
+        return self.images[img_path]
 
 class QCMApp(tk.Tk):
     def __init__(self):
@@ -48,6 +171,7 @@ class QCMApp(tk.Tk):
         self.title("Quiz QCM")
 
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
+        self.assets = AssetManager(self.base_dir)
 
         try:
             icon_path = os.path.join(self.base_dir, "Assets", "GF.ico")
@@ -72,7 +196,9 @@ class QCMApp(tk.Tk):
         
         # Variables
         self.current_sound_path = None
-        self.temp_sound_file = None # Pour stocker le chemin du fichier temporaire
+        # Fichiers temporaires déjà générés : {(fichier, date, volume): chemin}
+        self.volume_cache = {}
+        self.volume_lock = threading.Lock()
         self.volume_level = DEFAULT_VOLUME
 
         # --- THÈMES ---
@@ -96,6 +222,9 @@ class QCMApp(tk.Tk):
             }
         }
         
+        # Widgets tk enregistrés par rôle de thème : {rôle: [widgets]} (oubliés à leur destruction)
+        self.themed_widgets = {role: [] for role in THEME_ROLES}
+
         self.toolbar_frame = ttk.Frame(self)
         self.toolbar_frame.pack(fill='x', padx=10, pady=5)
         
@@ -104,12 +233,25 @@ class QCMApp(tk.Tk):
             font=("Arial", 14), bd=0, relief="flat", padx=10, pady=5
         )
         self.theme_button.pack(side='right', padx=5, pady=5)
+        self.themed(self.theme_button, "toolbar_button")
         
         self.apply_theme()
         
         json_dir = backend.get_json_dir(__file__)
         self.chapter_files, self.chapters = backend.load_chapters(json_dir)
-        self.question_stats = backend.load_stats()
+        # Écritures disque (stats, banques) faites par un thread, jamais par la boucle Tk
+        self.persistence = backend.PersistenceWorker()
+        self.profile = backend.get_profile()
+        self.question_stats = backend.load_stats(writer=self.persistence, profile=self.profile)
+        self.after(100, self.poll_persistence)
+        # Index de recherche construit par tranches à la première recherche, mis à jour à chaque modification
+        self.search_index = SearchIndex()
+        self.search_index_steps = None
+        self.search_index_job = None
+        self.search_index_ready = False
+        self.search_results = []
+        self.pending_search = None
+        backend.add_edit_listener(self.search_index.reindex)
 
         # --- VARIABLES DE CONFIGURATION ---
         self.num_questions_var = tk.IntVar(value=20)
@@ -118,12 +260,30 @@ class QCMApp(tk.Tk):
 
         self.create_main_menu()
         
+        # Chronomètre du quiz (horloge monotone) : début, durée finale, rafraîchissement en attente
+        self.start_time = None
+        self.final_time = None
+        self.timer_job = None
+
+        # Largeur utilisée pour le dernier calcul des retours à la ligne, et reflow en attente
+        self.layout_width = None
+        self.pending_reflow = None
         self.bind("<Configure>", self.on_window_resize)
 
     # --- GESTION AUDIO (STABLE via Fichier Temporaire) ---
     def create_volume_adjusted_file(self, file_path, volume):
-        """Crée un fichier temporaire avec le volume réduit"""
+        """Crée (ou réutilise) un fichier temporaire avec le volume réduit"""
+        # Peut être appelé par le thread d'écriture (préchargement) : un seul calcul à la fois
+        with self.volume_lock:
+            return self._create_volume_adjusted_file(file_path, volume)
+
+    def _create_volume_adjusted_file(self, file_path, volume):
         try:
+            cache_key = (file_path, os.path.getmtime(file_path), volume)
+            cached = self.volume_cache.get(cache_key)
+            if cached and os.path.exists(cached):
+                return cached
+
             with wave.open(file_path, 'rb') as wav_in:
                 if wav_in.getsampwidth() != 2: 
                     return file_path # On ne touche pas si format exotique
@@ -131,12 +291,8 @@ class QCMApp(tk.Tk):
                 params = wav_in.getparams()
                 frames = wav_in.readframes(params.nframes)
 
-            # Traitement binaire
-            fmt = "<" + "h" * (len(frames) // 2)
-            samples = list(struct.unpack(fmt, frames))
-            # Réduction du volume
-            samples = [int(s * volume) for s in samples]
-            new_frames = struct.pack(fmt, *samples)
+            # Réduction du volume directement sur le buffer
+            new_frames = scale_pcm16(frames, volume)
             
             # Création fichier temp physique (pas en mémoire)
             fd, temp_path = tempfile.mkstemp(suffix=".wav")
@@ -145,6 +301,7 @@ class QCMApp(tk.Tk):
                     wav_out.setparams(params)
                     wav_out.writeframes(new_frames)
             
+            self.volume_cache[cache_key] = temp_path
             return temp_path
         except Exception as e:
             print(f"Erreur création son temp: {e}")
@@ -159,8 +316,6 @@ class QCMApp(tk.Tk):
         # Gestion du volume (Code existant conservé)
         if self.volume_level < 0.99:
             target_path = self.create_volume_adjusted_file(file_path, self.volume_level)
-            if target_path != file_path:
-                self.temp_sound_file = target_path
 
         self.current_sound_path = target_path
         
@@ -194,14 +349,17 @@ class QCMApp(tk.Tk):
                     self.mac_sound_process = None
                 except: pass
 
-        # Nettoyage fichier temporaire (Code existant conservé)
-        if self.temp_sound_file and os.path.exists(self.temp_sound_file):
+    def clear_sound_cache(self):
+        """Supprime les fichiers son temporaires (à la fermeture)"""
+        self.stop_sound()
+        for temp_path in self.volume_cache.values():
             try:
-                os.remove(self.temp_sound_file)
-            except: pass 
-            self.temp_sound_file = None
+                os.remove(temp_path)
+            except OSError: pass
+        self.volume_cache.clear()
 
     # --- THEME & WIDGETS ---
+    @instrumentation.hot_path
     def apply_theme(self):
         theme = self.themes[self.theme_mode]
         self.configure(background=theme['bg'])
@@ -221,77 +379,93 @@ class QCMApp(tk.Tk):
         self.style.configure("Large.TCheckbutton", font=LARGE_FONT)
         self.style.configure("TScrollbar", background=theme['scrollbar'], troughcolor=theme['bg'])
         self.style.configure("Hover.TFrame", background=theme['hover'])
+        self.style.configure("Treeview", background=theme['bg'], fieldbackground=theme['bg'],
+                             foreground=theme['fg'], font=LARGE_FONT, rowheight=30)
+        self.style.map("Treeview", background=[('selected', theme['selected_bg'])],
+                       foreground=[('selected', theme['fg'])])
         self.style.configure("Custom.Horizontal.TProgressbar", background=theme['primary'],
                              troughcolor=theme['bg'], bordercolor=theme['bg'],
                              lightcolor=theme['primary'], darkcolor=theme['primary'])
+
+        # Correction : les couleurs passent par des styles, un changement de thème suffit à les mettre à jour
+        self.style.configure("Correct.TFrame", background=theme['correct_bg'])
+        self.style.configure("Incorrect.TFrame", background=theme['incorrect_bg'])
+        self.style.configure("CorrectOption.TLabel", foreground=theme['correct_fg'])
+        self.style.configure("IncorrectOption.TLabel", foreground=theme['incorrect_fg'])
+        self.style.configure("CorrectFeedback.TLabel", foreground=theme['correct'])
+        self.style.configure("IncorrectFeedback.TLabel", foreground=theme['incorrect'])
         
-        self.theme_button.configure(bg=theme['toolbar'], fg=theme['fg'],
-                                    activebackground=theme['toolbar'], activeforeground=theme['fg'])
-        self.update_all_widgets()
+        self.update_themed_widgets()
+
+    def themed(self, widget, role):
+        """Enregistre un widget tk classique pour un rôle de thème et lui applique le thème courant"""
+        self.themed_widgets[role].append(widget)
+        widget.configure(**THEME_ROLES[role](self.themes[self.theme_mode]))
+        # Écrans du quiz, du score et de l'éditeur : le widget quitte le registre avec eux
+        name = str(widget)
+        widget.bind("<Destroy>", lambda e: str(e.widget) == name and self.forget_themed(widget, role), add="+")
+        return widget
+
+    def forget_themed(self, widget, role):
+        try:
+            self.themed_widgets[role].remove(widget)
+        except ValueError:
+            pass
 
-    def update_all_widgets(self):
+    def update_themed_widgets(self):
+        """Reconfigure les widgets enregistrés (les widgets détruits sont oubliés au passage)"""
         theme = self.themes[self.theme_mode]
-        for widget in self.winfo_children():
-            self.update_widget_colors(widget, theme)
-
-    def update_widget_colors(self, widget, theme):
-        try:
-            widget_type = widget.winfo_class()
-            if widget_type == 'Frame': widget.configure(background=theme['bg'])
-            elif widget_type == 'Label': widget.configure(background=theme['bg'], foreground=theme['fg'])
-            elif widget_type == 'Button':
-                if widget != self.theme_button:
-                     widget.configure(bg=theme['button_bg'], fg=theme['button_fg'],
-                                     activebackground=theme['primary'], activeforeground=theme['button_fg'])
-            elif widget_type == 'Checkbutton':
-                widget.configure(bg=theme['bg'], fg=theme['fg'], activebackground=theme['bg'],
-                                activeforeground=theme['fg'], selectcolor=theme['selected_bg'])
-            elif widget_type == 'Canvas': widget.configure(bg=theme['canvas'], highlightthickness=0)
-            elif widget_type == 'Scrollbar': widget.configure(bg=theme['scrollbar'], troughcolor=theme['bg'])
-            elif widget_type == 'Progressbar': widget.configure(style="Custom.Horizontal.TProgressbar")
-        except: pass
-        
-        for child in widget.winfo_children():
-            self.update_widget_colors(child, theme)
+        touched = 0
+        for role, widgets in self.themed_widgets.items():
+            options = THEME_ROLES[role](theme)
+            alive = [w for w in widgets if w.winfo_exists()]
+            for widget in alive:
+                widget.configure(**options)
+            widgets[:] = alive
+            touched += len(alive)
+        return touched
 
     def toggle_theme(self):
         self.theme_mode = "dark" if self.theme_mode == "light" else "light"
         self.apply_theme()
         self.theme_button.configure(text="☀️" if self.theme_mode == "light" else "🌙")
-        if hasattr(self, 'feedback_mode') and self.feedback_mode:
-            self.update_feedback_colors()
 
     def update_feedback_colors(self):
-        theme = self.themes[self.theme_mode]
-        if self.is_correct: self.feedback_label.configure(foreground=theme['correct'])
-        else: self.feedback_label.configure(foreground=theme['incorrect'])
+        self.feedback_label.configure(style="CorrectFeedback.TLabel" if self.is_correct else "IncorrectFeedback.TLabel")
         
         correct_answers = self.current_correct_answers_list
         for i in range(len(self.option_labels)):
             option_char = chr(65 + i)
             if option_char in correct_answers:
                 self.option_frames[i].configure(style="Correct.TFrame")
-                self.option_labels[i].configure(foreground=theme['correct_fg'], font=("Arial", 16, "bold"))
+                self.option_labels[i].configure(style="CorrectOption.TLabel", font=("Arial", 16, "bold"))
             elif self.selected_answers[i].get():
                 self.option_frames[i].configure(style="Incorrect.TFrame")
-                self.option_labels[i].configure(foreground=theme['incorrect_fg'], font=("Arial", 16, "bold"))
+                self.option_labels[i].configure(style="IncorrectOption.TLabel", font=("Arial", 16, "bold"))
             else:
                 self.option_frames[i].configure(style="TFrame")
-                self.option_labels[i].configure(foreground=theme['fg'], font=LARGE_FONT)
+                self.option_labels[i].configure(style="TLabel", font=LARGE_FONT)
 
     def on_window_resize(self, event):
+        # Les <Configure> de tous les widgets remontent jusqu'ici : seule la largeur de la fenêtre compte
+        if event.widget is not self or event.width == self.layout_width:
+            return
+        self.layout_width = event.width
+        # Un seul reflow par passage dans la boucle, quel que soit le nombre d'événements
+        if self.pending_reflow is None:
+            self.pending_reflow = self.after_idle(self.run_reflow)
+
+    def run_reflow(self):
+        self.pending_reflow = None
         self.update_wraplengths()
 
     def update_wraplengths(self):
         if hasattr(self, 'question_label') and self.question_label.winfo_exists():
             new_width = self.winfo_width() - 100
             self.question_label.configure(wraplength=new_width)
-            if hasattr(self, 'scrollable_frame') and self.scrollable_frame.winfo_exists():
-                for child in self.scrollable_frame.winfo_children():
-                    if child.winfo_exists():
-                        for subchild in child.winfo_children():
-                            if isinstance(subchild, ttk.Label) and subchild.winfo_exists():
-                                subchild.configure(wraplength=new_width - 50)
+            for option_frame, answer_checkbutton, option_label, var in self.option_rows:
+                option_label.configure(wraplength=new_width - 50)
+            self.feedback_label.configure(wraplength=new_width - 50)
 
     # --- MENU PRINCIPAL ---
     def create_main_menu(self):
@@ -300,7 +474,7 @@ class QCMApp(tk.Tk):
         
         theme = self.themes[self.theme_mode]
         
-        canvas = tk.Canvas(self.main_menu_frame, bg=theme['bg'], highlightthickness=0)
+        canvas = self.themed(tk.Canvas(self.main_menu_frame, bg=theme['bg'], highlightthickness=0), "canvas")
         scrollbar = ttk.Scrollbar(self.main_menu_frame, orient="vertical", command=canvas.yview)
         scrollable_frame = ttk.Frame(canvas)
 
@@ -319,8 +493,11 @@ class QCMApp(tk.Tk):
         def _on_mousewheel(event):
             canvas.yview_scroll(int(-1*(event.delta/120)), "units")
         
-        canvas.bind_all("<MouseWheel>", _on_mousewheel)
-        self.unbind_scroll = lambda: canvas.unbind_all("<MouseWheel>")
+        def bind_scroll():
+            canvas.bind_all("<MouseWheel>", _on_mousewheel)
+            self.unbind_scroll = lambda: canvas.unbind_all("<MouseWheel>")
+        self.bind_menu_scroll = bind_scroll
+        bind_scroll()
 
         scrollable_frame.grid_columnconfigure(0, weight=1)
 
@@ -335,6 +512,18 @@ class QCMApp(tk.Tk):
             activeforeground=theme['fg']
         )
         ee_check.pack(side='left', padx=5)
+        self.themed(ee_check, "checkbutton")
+
+        # Profil : chaque élève a ses propres stats (saisir un nouveau nom crée le profil)
+        ttk.Label(top_controls_frame, text="Profil:", font=LARGE_FONT).pack(side='left', padx=(15, 5))
+        self.profile_var = tk.StringVar(value=self.profile)
+        self.profile_box = ttk.Combobox(
+            top_controls_frame, textvariable=self.profile_var, width=12, font=LARGE_FONT,
+            values=sorted(set(backend.list_profiles()) | {self.profile})
+        )
+        self.profile_box.pack(side='left', padx=5)
+        self.profile_box.bind("<<ComboboxSelected>>", lambda e: self.switch_profile(self.profile_var.get()))
+        self.profile_box.bind("<Return>", lambda e: self.switch_profile(self.profile_var.get()))
 
         settings_frame = ttk.Frame(top_controls_frame)
         settings_frame.pack(side='right')
@@ -350,6 +539,7 @@ class QCMApp(tk.Tk):
             activeforeground=theme['fg']
         )
         shuffle_check.pack(side='left', padx=(10, 0))
+        self.themed(shuffle_check, "checkbutton")
 
         # --- TITRE ET CHAPITRES ---
         ttk.Label(scrollable_frame, text="Choisissez un chapitre", font=TITLE_FONT).pack(pady=20)
@@ -367,36 +557,39 @@ class QCMApp(tk.Tk):
             )
             debug_btn.pack(pady=5, fill='x')
 
-        self.chapter_vars = []
-
-        # En-tête pour guider l'utilisateur
-        selection_frame = ttk.Frame(button_frame)
-        selection_frame.pack(fill='x', pady=(0, 10))
-        ttk.Label(selection_frame, text="Cochez pour mélanger :", font=("Arial", 10, "italic")).pack(anchor='w')
-
-        for i, chapter_path in enumerate(self.chapter_files):
-            filename = os.path.basename(chapter_path)
-            display_name = os.path.splitext(filename)[0]
-            
-            # Un cadre par ligne pour aligner Checkbox + Bouton
-            row_frame = ttk.Frame(button_frame)
-            row_frame.pack(fill='x', pady=2)
-            
-            # Case à cocher pour la sélection multiple
-            var = tk.BooleanVar(value=False)
-            self.chapter_vars.append(var)
-            
-            chk = ttk.Checkbutton(row_frame, variable=var)
-            chk.pack(side='left', padx=(0, 10))
-            
-            # Bouton pour lancer UNIQUEMENT ce chapitre
-            btn = ttk.Button(
-                row_frame, 
-                text=display_name, 
-                command=lambda i=i: self.start_quiz(i), 
-                style="Large.TButton"
-            )
-            btn.pack(side='left', fill='x', expand=True)
+        # Liste des chapitres : un Treeview n'affiche que les lignes visibles, et le menu
+        # est construit une seule fois (les coches sont conservées d'une visite à l'autre)
+        self.selected_chapters = set()
+        self.chapter_double_click = False
+        self.chapter_names = [os.path.splitext(os.path.basename(path))[0] for path in self.chapter_files]
+
+        filter_frame = ttk.Frame(button_frame)
+        filter_frame.pack(fill='x', pady=(0, 5))
+        ttk.Label(filter_frame, text="Filtrer :", font=LARGE_FONT).pack(side='left')
+        self.chapter_filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(filter_frame, textvariable=self.chapter_filter_var, font=LARGE_FONT)
+        filter_entry.pack(side='left', fill='x', expand=True, padx=5)
+        filter_entry.bind("<KeyRelease>", lambda e: self.filter_chapters())
+
+        ttk.Label(button_frame, text="Cochez (clic) pour mélanger, double-clic pour lancer un chapitre :",
+                  font=("Arial", 10, "italic")).pack(anchor='w')
+
+        tree_frame = ttk.Frame(button_frame)
+        tree_frame.pack(fill='x', pady=5)
+        self.chapter_tree = ttk.Treeview(tree_frame, show='tree', selectmode='browse',
+                                         height=min(CHAPTER_LIST_HEIGHT, max(len(self.chapter_files), 1)))
+        tree_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.chapter_tree.yview)
+        self.chapter_tree.configure(yscrollcommand=tree_scrollbar.set)
+        self.chapter_tree.pack(side='left', fill='x', expand=True)
+        tree_scrollbar.pack(side='right', fill='y')
+        for i, display_name in enumerate(self.chapter_names):
+            self.chapter_tree.insert('', 'end', iid=str(i), text=f"{CHECK_OFF}  {display_name}")
+        self.chapter_tree.bind("<ButtonRelease-1>", self.on_chapter_click)
+        self.chapter_tree.bind("<space>", lambda e: self.toggle_chapter(self.chapter_tree.focus()))
+        self.chapter_tree.bind("<Double-1>", self.on_chapter_double_click)
+        self.chapter_tree.bind("<Return>", lambda e: self.launch_focused_chapter())
+        # La molette fait défiler la liste, pas la page
+        self.chapter_tree.bind("<MouseWheel>", lambda e: (self.chapter_tree.yview_scroll(int(-1*(e.delta/120)), "units"), "break")[1])
 
         ttk.Separator(button_frame, orient='horizontal').pack(fill='x', pady=20)
 
@@ -420,9 +613,86 @@ class QCMApp(tk.Tk):
             pady=10
         )
         error_btn.pack(pady=15, fill='x')
+
+        ttk.Button(
+            button_frame,
+            text="🆕 Questions jamais vues (sélection ou tout)",
+            command=self.start_unseen_quiz,
+            style="Large.TButton"
+        ).pack(pady=5, fill='x')
+
+        # --- RECHERCHE ---
+        ttk.Separator(button_frame, orient='horizontal').pack(fill='x', pady=10)
+        ttk.Label(button_frame, text="🔎 Rechercher dans les questions :", font=LARGE_FONT).pack(anchor='w')
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(button_frame, textvariable=self.search_var, font=LARGE_FONT)
+        search_entry.pack(fill='x', pady=5)
+        search_entry.bind("<KeyRelease>", self.on_search_changed)
+        self.search_count_label = ttk.Label(button_frame, text="", font=("Arial", 10, "italic"))
+        self.search_count_label.pack(anchor='w')
+        self.search_listbox = self.themed(tk.Listbox(
+            button_frame, height=8, font=("Arial", 11), activestyle='none',
+            bg=theme['bg'], fg=theme['fg'], highlightthickness=0
+        ), "label")
+        self.search_listbox.pack(fill='x', pady=5)
+        ttk.Button(
+            button_frame,
+            text="Lancer le QCM sur les résultats",
+            command=self.start_search_quiz,
+            style="Large.TButton"
+        ).pack(pady=5, fill='x')
         
         ttk.Frame(button_frame, height=50).pack()
 
+    def show_main_menu(self):
+        """Réaffiche le menu existant (pas de reconstruction)"""
+        self.main_menu_frame.pack(expand=True, fill='both')
+        self.bind_menu_scroll()
+
+    # --- LISTE DES CHAPITRES ---
+    def filter_chapters(self):
+        """N'affiche que les chapitres dont le nom contient le texte du filtre (sans accents)"""
+        needle = fold(self.chapter_filter_var.get().strip())
+        position = 0
+        for i, display_name in enumerate(self.chapter_names):
+            iid = str(i)
+            if needle in fold(display_name):
+                self.chapter_tree.move(iid, '', position)
+                position += 1
+            else:
+                self.chapter_tree.detach(iid)
+
+    def toggle_chapter(self, iid):
+        if not iid:
+            return
+        i = int(iid)
+        if i in self.selected_chapters:
+            self.selected_chapters.discard(i)
+            mark = CHECK_OFF
+        else:
+            self.selected_chapters.add(i)
+            mark = CHECK_ON
+        self.chapter_tree.item(iid, text=f"{mark}  {self.chapter_names[i]}")
+
+    def on_chapter_click(self, event):
+        iid = self.chapter_tree.identify_row(event.y)
+        if iid and not self.chapter_double_click:
+            self.toggle_chapter(iid)
+        self.chapter_double_click = False
+
+    def on_chapter_double_click(self, event):
+        iid = self.chapter_tree.identify_row(event.y)
+        if iid:
+            # Le premier clic a basculé la coche : on l'annule, et on ignore le second relâchement
+            self.toggle_chapter(iid)
+            self.chapter_double_click = True
+            self.start_quiz(int(iid))
+
+    def launch_focused_chapter(self):
+        iid = self.chapter_tree.focus()
+        if iid:
+            self.start_quiz(int(iid))
+
     # --- DEBUG ---
     def debug_show_score(self):
         score_input = simpledialog.askinteger("Debug", "Entrez le score en % (0-100) :", parent=self, minvalue=0, maxvalue=100)
@@ -434,9 +704,10 @@ class QCMApp(tk.Tk):
         self.quiz_frame.pack(fill='both', expand=True, padx=20, pady=20)
         
         self.current_chapter = ["Fake"] * 10
-        self.score = int(len(self.current_chapter) * (score_input / 100))
+        self.session = backend.QuizSession(self.current_chapter, {})
+        self.session.score = int(len(self.current_chapter) * (score_input / 100))
         self.final_time = 125 
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
         self.last_chapter_index = -1
         
         self.show_final_score()
@@ -449,13 +720,13 @@ class QCMApp(tk.Tk):
         self.stop_sound()
             
         self.main_menu_frame.pack_forget()
-        self.last_chapter_index = chapter_index 
+        if chapter_index >= 0:
+            self.last_chapter_index = chapter_index
         self.quiz_frame = ttk.Frame(self)
         self.quiz_frame.pack(fill='both', expand=True, padx=20, pady=20)
         self.quiz_frame.grid_columnconfigure(0, weight=1)
         self.quiz_frame.grid_rowconfigure(0, weight=1)
 
-        self.current_question = 0
         num_questions = self.num_questions_var.get()
         
         if chapter_index == -1:
@@ -464,16 +735,16 @@ class QCMApp(tk.Tk):
             raw_chapter = list(self.chapters[self.chapter_files[chapter_index]])
             self.current_chapter = backend.smart_select_questions(raw_chapter, num_questions, self.question_stats)
             
-        self.total_questions = len(self.current_chapter)
-        self.score = 0
-        self.start_time = time.time()
+        self.session = backend.QuizSession(self.current_chapter, self.question_stats,
+                                           shuffle_options=self.shuffle_options_var.get())
+        self.start_time = time.monotonic()
         self.feedback_mode = False
         self.final_time = None
         self.show_question()
 
     def start_mixed_quiz_selected(self):
         # On récupère les indices des chapitres cochés
-        selected_indices = [i for i, var in enumerate(self.chapter_vars) if var.get()]
+        selected_indices = sorted(self.selected_chapters)
         
         if not selected_indices:
             messagebox.showwarning("Attention", "Veuillez sélectionner au moins un chapitre (ou lancez un chapitre individuel).")
@@ -495,6 +766,7 @@ class QCMApp(tk.Tk):
         self.current_chapter = backend.smart_select_questions(selected_questions, num_questions, self.question_stats)
         
         # On lance le quiz en mode "mixte" (index -1)
+        self.last_chapter_index = -1
         self.start_quiz(-1)
 
     def mix_all_chapters(self):
@@ -502,11 +774,11 @@ class QCMApp(tk.Tk):
         mixed_questions = [question for chapter in all_chapters for question in chapter]
         num_questions = self.num_questions_var.get()
         self.current_chapter = backend.smart_select_questions(mixed_questions, num_questions, self.question_stats)
+        self.last_chapter_index = -1
         self.start_quiz(-1)
 
     def start_error_review(self):
-        all_questions = [q for chapter in self.chapters.values() for q in chapter]
-        error_questions = backend.get_incorrect_questions(all_questions, self.question_stats)
+        error_questions = backend.get_error_questions(self.chapters, self.question_stats)
         
         if not error_questions:
             messagebox.showinfo("Félicitations !", "Aucune erreur enregistrée pour le moment.\nContinuez à vous entraîner sur les chapitres !")
@@ -517,6 +789,69 @@ class QCMApp(tk.Tk):
         self.last_chapter_index = -2 
         self.start_quiz(-1)
 
+    def start_unseen_quiz(self):
+        # Chapitres cochés, ou toute la bibliothèque si aucun
+        indices = sorted(self.selected_chapters) or range(len(self.chapter_files))
+        chapter_files = [self.chapter_files[i] for i in indices]
+        unseen_questions = backend.get_unseen_questions(self.chapters, self.question_stats, chapter_files)
+
+        if not unseen_questions:
+            messagebox.showinfo("Félicitations !", "Toutes les questions de ces chapitres ont déjà été vues.")
+            return
+
+        random.shuffle(unseen_questions)
+        self.current_chapter = unseen_questions[:self.num_questions_var.get()]
+        self.last_chapter_index = -4
+        self.start_quiz(-1)
+
+    def on_search_changed(self, event=None):
+        # Recherche relancée quand la frappe s'arrête (l'index est construit à la première)
+        if self.pending_search is not None:
+            self.after_cancel(self.pending_search)
+        self.pending_search = self.after(150, self.run_search)
+
+    def run_search(self):
+        self.pending_search = None
+        if not self.search_index_ready:
+            # Première recherche : l'index se construit par tranches, la recherche suivra
+            if self.search_index_job is None:
+                self.search_index_steps = self.search_index.iter_index_chapters(self.chapters, self.chapter_files)
+                self.search_index_job = self.after_idle(self.index_search_step)
+                self.search_count_label.config(text="Indexation des questions…")
+            return
+        query = self.search_var.get()
+        self.search_results = self.search_index.search(query)
+        self.search_listbox.delete(0, 'end')
+        for question in self.search_results[:SEARCH_DISPLAY_LIMIT]:
+            chapter = os.path.splitext(os.path.basename(question.source_file))[0]
+            self.search_listbox.insert('end', f"[{chapter}] {question.question}")
+        if query.strip():
+            self.search_count_label.config(text=f"{len(self.search_results)} question(s) trouvée(s)")
+        else:
+            self.search_count_label.config(text="")
+
+    def index_search_step(self):
+        """Indexe pendant au plus SEARCH_INDEX_SLICE puis rend la main à l'interface"""
+        deadline = time.perf_counter() + SEARCH_INDEX_SLICE
+        for done, total in self.search_index_steps:
+            if time.perf_counter() >= deadline:
+                self.search_count_label.config(text=f"Indexation des questions… {done}/{total} chapitres")
+                self.search_index_job = self.after(1, self.index_search_step)
+                return
+        self.search_index_job = None
+        self.search_index_steps = None
+        self.search_index_ready = True
+        self.run_search()
+
+    def start_search_quiz(self):
+        if not self.search_results:
+            messagebox.showwarning("Attention", "Aucune question ne correspond à la recherche.")
+            return
+        num_questions = self.num_questions_var.get()
+        self.current_chapter = backend.smart_select_questions(self.search_results, num_questions, self.question_stats)
+        self.last_chapter_index = -3
+        self.start_quiz(-1)
+
     def restart_quiz(self):
         self.stop_sound()
             
@@ -526,22 +861,28 @@ class QCMApp(tk.Tk):
             self.mix_all_chapters()
         elif self.last_chapter_index == -2:
             self.start_error_review()
+        elif self.last_chapter_index == -3:
+            self.start_search_quiz()
+        elif self.last_chapter_index == -4:
+            self.start_unseen_quiz()
         else:
             self.start_quiz(self.last_chapter_index)
 
-    def show_question(self):
-        self.feedback_mode = False
+    def build_question_view(self):
+        """Crée une seule fois (par quiz) les widgets de l'écran question ; show_question ne fait ensuite que les reconfigurer"""
         self.clear_frame(self.quiz_frame)
 
         main_container = ttk.Frame(self.quiz_frame)
         main_container.pack(fill='both', expand=True)
         main_container.grid_columnconfigure(0, weight=1)
         main_container.grid_rowconfigure(0, weight=1)
+        self.question_view = main_container
         
         theme = self.themes[self.theme_mode]
-        canvas = tk.Canvas(main_container, bg=theme['canvas'], highlightthickness=0)
+        canvas = self.themed(tk.Canvas(main_container, bg=theme['canvas'], highlightthickness=0), "canvas")
         scrollbar = ttk.Scrollbar(main_container, orient="vertical", command=canvas.yview)
         self.scrollable_frame = ttk.Frame(canvas)
+        self.question_canvas = canvas
 
         self.scrollable_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
         canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
@@ -556,58 +897,19 @@ class QCMApp(tk.Tk):
         canvas.bind_all("<MouseWheel>", _on_mousewheel)
         self.unbind_scroll = lambda: canvas.unbind_all("<MouseWheel>")
 
-        self.current_question_data = self.current_chapter[self.current_question]
-        
-        raw_options = self.current_question_data["options"]
-        raw_correct = self.current_question_data["correct_answers"]
-        
-        if self.shuffle_options_var.get():
-            indexed_options = list(enumerate(raw_options))
-            random.shuffle(indexed_options)
-            self.display_options = [text for _, text in indexed_options]
-            original_correct_indices = [ord(c) - 65 for c in raw_correct]
-            self.current_correct_answers_list = []
-            for new_index, (old_index, text) in enumerate(indexed_options):
-                if old_index in original_correct_indices:
-                    self.current_correct_answers_list.append(chr(65 + new_index))
-        else:
-            self.display_options = list(raw_options)
-            self.current_correct_answers_list = list(raw_correct)
-
         self.question_label = ttk.Label(
-            self.scrollable_frame, text=self.current_question_data["question"],
-            font=LARGE_FONT, wraplength=self.winfo_width() - 100, justify="left", anchor="w"
+            self.scrollable_frame, font=LARGE_FONT, wraplength=self.winfo_width() - 100, justify="left", anchor="w"
         )
         self.question_label.pack(fill='x', padx=20, pady=20, anchor='w')
 
-        self.selected_answers = [tk.BooleanVar() for _ in self.display_options]
-        self.option_frames = []
-        self.option_labels = []
-        self.option_checkbuttons = []
-        
-        for i, option_text in enumerate(self.display_options):
-            clean_text = re.sub(r'^[A-E0-9][\.\)]\s*', '', option_text)
-            
-            option_frame = ttk.Frame(self.scrollable_frame)
-            option_frame.pack(fill='x', padx=20, pady=5, anchor='w')
-            self.option_frames.append(option_frame)
-            
-            answer_checkbutton = ttk.Checkbutton(option_frame, variable=self.selected_answers[i], style="Large.TCheckbutton")
-            answer_checkbutton.pack(side='left', anchor='w', padx=(0, 10))
-            self.option_checkbuttons.append(answer_checkbutton)
-            
-            display_label = f"{chr(65+i)}. {clean_text}"
-            option_label = ttk.Label(
-                option_frame, text=display_label, font=LARGE_FONT,
-                wraplength=self.winfo_width() - 150, justify="left", anchor="w"
-            )
-            option_label.pack(side='left', fill='x', expand=True, anchor='w')
-            self.option_labels.append(option_label)
-            
-            option_label.bind("<Button-1>", lambda e, idx=i: self.option_checkbuttons[idx].invoke())
-            for w in (option_frame, answer_checkbutton, option_label):
-                w.bind("<Enter>", lambda e, idx=i: self.on_option_hover(idx))
-                w.bind("<Leave>", lambda e, idx=i: self.on_option_leave(idx))
+        # Lignes d'options réutilisées d'une question à l'autre (complétées si besoin)
+        self.options_container = ttk.Frame(self.scrollable_frame)
+        self.options_container.pack(fill='x')
+        self.option_rows = []
+
+        self.feedback_frame = ttk.Frame(self.scrollable_frame)
+        self.feedback_label = ttk.Label(self.feedback_frame, font=("Arial", 18, "bold"))
+        self.feedback_label.pack(side='left')
 
         button_frame = ttk.Frame(main_container)
         button_frame.grid(row=1, column=0, columnspan=2, pady=20, sticky="ew")
@@ -621,6 +923,7 @@ class QCMApp(tk.Tk):
             activebackground=self.themes[self.theme_mode]['bg'], cursor="hand2"
         )
         edit_button.pack(side='top', pady=5)
+        self.themed(edit_button, "flat_button")
 
         quit_button = tk.Button(
             button_frame, text="Retour au menu", command=self.return_to_main_menu,
@@ -628,6 +931,7 @@ class QCMApp(tk.Tk):
             activebackground=self.themes[self.theme_mode]['bg'], cursor="hand2"
         )
         quit_button.pack(side='top', pady=10)
+        self.themed(quit_button, "flat_button")
 
         progress_frame = ttk.Frame(main_container)
         progress_frame.grid(row=2, column=0, columnspan=2, sticky="ew", padx=20, pady=10)
@@ -635,7 +939,6 @@ class QCMApp(tk.Tk):
         self.progress_var = tk.DoubleVar()
         self.progress_bar = ttk.Progressbar(progress_frame, variable=self.progress_var, maximum=100, style="Custom.Horizontal.TProgressbar", mode='determinate')
         self.progress_bar.pack(fill='x', expand=True)
-        self.progress_var.set(((self.current_question + 1) / len(self.current_chapter)) * 100)
 
         bottom_frame = ttk.Frame(main_container)
         bottom_frame.grid(row=3, column=0, columnspan=2, sticky="ew", padx=20, pady=10)
@@ -643,54 +946,112 @@ class QCMApp(tk.Tk):
         self.time_label_var = tk.StringVar()
         self.update_timer()
         ttk.Label(bottom_frame, textvariable=self.time_label_var, font=LARGE_FONT).pack(side='left')
-        remaining = len(self.current_chapter) - self.current_question
-        ttk.Label(bottom_frame, text=f"Questions restantes : {remaining}", font=LARGE_FONT).pack(side='right')
+        self.remaining_label = ttk.Label(bottom_frame, font=LARGE_FONT)
+        self.remaining_label.pack(side='right')
+
+    def add_option_row(self):
+        """Ajoute une ligne d'option (case + texte) au pool, avec ses bindings"""
+        i = len(self.option_rows)
+        var = tk.BooleanVar()
+        option_frame = ttk.Frame(self.options_container)
+        answer_checkbutton = ttk.Checkbutton(option_frame, variable=var, style="Large.TCheckbutton")
+        answer_checkbutton.pack(side='left', anchor='w', padx=(0, 10))
+        option_label = ttk.Label(
+            option_frame, font=LARGE_FONT,
+            wraplength=self.winfo_width() - 150, justify="left", anchor="w"
+        )
+        option_label.pack(side='left', fill='x', expand=True, anchor='w')
 
-        self.update_wraplengths()
+        option_label.bind("<Button-1>", lambda e: answer_checkbutton.invoke())
+        for w in (option_frame, answer_checkbutton, option_label):
+            w.bind("<Enter>", lambda e, idx=i: self.on_option_hover(idx))
+            w.bind("<Leave>", lambda e, idx=i: self.on_option_leave(idx))
+        self.option_rows.append((option_frame, answer_checkbutton, option_label, var))
 
+    @instrumentation.hot_path
+    def show_question(self):
+        self.feedback_mode = False
+        if not getattr(self, 'question_view', None) or not self.question_view.winfo_exists():
+            self.build_question_view()
+
+        # Mélange des options et lettres correctes : gérés par la session
+        presented = self.session.present()
+        self.current_question_data = presented.question
+        self.display_options = presented.options
+        self.current_correct_answers_list = presented.correct_answers
+
+        self.question_label.configure(text=self.current_question_data.question)
+
+        num_options = len(self.display_options)
+        while len(self.option_rows) < num_options:
+            self.add_option_row()
+        for i, (option_frame, answer_checkbutton, option_label, var) in enumerate(self.option_rows):
+            if i >= num_options:
+                option_frame.pack_forget()
+                continue
+            clean_text = re.sub(r'^[A-E0-9][\.\)]\s*', '', self.display_options[i])
+            var.set(False)
+            answer_checkbutton.configure(state=tk.NORMAL)
+            option_frame.configure(style="TFrame")
+            option_label.configure(text=f"{chr(65+i)}. {clean_text}", style="TLabel", font=LARGE_FONT)
+            if not option_frame.winfo_manager():
+                option_frame.pack(fill='x', padx=20, pady=5, anchor='w')
+
+        visible_rows = self.option_rows[:num_options]
+        self.option_frames = [row[0] for row in visible_rows]
+        self.option_checkbuttons = [row[1] for row in visible_rows]
+        self.option_labels = [row[2] for row in visible_rows]
+        self.selected_answers = [row[3] for row in visible_rows]
+
+        self.feedback_frame.pack_forget()
+        self.validate_button.configure(text="Valider", command=self.check_answer)
+        self.progress_var.set(((self.session.index + 1) / len(self.session)) * 100)
+        self.remaining_label.configure(text=f"Questions restantes : {self.session.remaining}")
+        self.question_canvas.yview_moveto(0)
+
+    @instrumentation.hot_path
     def check_answer(self):
         self.feedback_mode = True
-        theme = self.themes[self.theme_mode]
-        self.style.configure("Correct.TFrame", background=theme['correct_bg'])
-        self.style.configure("Incorrect.TFrame", background=theme['incorrect_bg'])
-        
-        correct_answers = self.current_correct_answers_list
         user_answers = [chr(i + 65) for i, selected in enumerate(self.selected_answers) if selected.get()]
 
-        question_key = backend.get_question_key(self.current_question_data)
-        question_stats = self.question_stats.get(str(question_key), {"correct": 0, "incorrect": 0})
-
-        self.is_correct = sorted(correct_answers) == sorted(user_answers)
+        # Correction, score et stats (journalisées tout de suite) : gérés par la session
+        self.is_correct = self.session.answer(user_answers)
         
         if self.is_correct:
-            question_stats["correct"] += 1
-            self.score += 1
             feedback_text = "✓ Bonne réponse !"
-            feedback_color = theme['correct']
         else:
-            question_stats["incorrect"] += 1
             feedback_text = "✗ Mauvaise réponse"
-            feedback_color = theme['incorrect']
 
-        self.question_stats[str(question_key)] = question_stats
+        # Temps de réponse de cette question (toutes sessions confondues)
+        latency = backend.latency_summary(self.question_stats.get(backend.get_question_key(self.current_question_data)))
+        if latency:
+            p90 = f"{latency['p90']} s" if latency['p90'] != float("inf") else f"> {backend.LATENCY_BUCKETS[-1]} s"
+            feedback_text += f"   ⏱ {latency['mean']:.0f} s en moyenne ({latency['count']} réponse(s), 90 % ≤ {p90})"
         
-        feedback_frame = ttk.Frame(self.scrollable_frame)
-        feedback_frame.pack(fill='x', padx=20, pady=10, anchor='w')
-        self.feedback_label = ttk.Label(feedback_frame, text=feedback_text, font=("Arial", 18, "bold"), foreground=feedback_color)
-        self.feedback_label.pack(side='left')
+        self.feedback_label.configure(text=feedback_text)
+        self.feedback_frame.pack(fill='x', padx=20, pady=10, anchor='w')
         
         for cb in self.option_checkbuttons: cb.configure(state=tk.DISABLED)
         self.validate_button.configure(text="Continuer", command=self.next_question)
         self.update_feedback_colors()
+        self.prefetch_score_assets()
+
+    def prefetch_score_assets(self):
+        """Précharge l'image/son du palier de score vers lequel le quiz se dirige"""
+        if not self.easter_egg_enabled_var.get() or not self.session.answered:
+            return
+        percentage = (self.session.score / self.session.answered) * 100
+        self.assets.prefetch(int((percentage // 10) * 10), self)
 
     def next_question(self):
-        self.current_question += 1
-        if self.current_question < len(self.current_chapter):
+        if self.session.advance():
             self.show_question()
         else:
-            self.final_time = time.time() - self.start_time
+            self.final_time = time.monotonic() - self.start_time
+            self.stop_timer()
             self.show_final_score()
 
+    @instrumentation.hot_path
     def show_final_score(self):
         self.clear_frame(self.quiz_frame)
         
@@ -699,7 +1060,7 @@ class QCMApp(tk.Tk):
         
         theme = self.themes[self.theme_mode]
         
-        canvas = tk.Canvas(container, bg=theme['bg'], highlightthickness=0)
+        canvas = self.themed(tk.Canvas(container, bg=theme['bg'], highlightthickness=0), "canvas")
         scrollbar = ttk.Scrollbar(container, orient="vertical", command=canvas.yview)
         scrollable_frame = ttk.Frame(canvas)
 
@@ -721,58 +1082,31 @@ class QCMApp(tk.Tk):
         scrollable_frame.grid_columnconfigure(0, weight=1)
         
         # --- CALCUL SCORE ---
-        if len(self.current_chapter) > 0:
-            percentage = (self.score / len(self.current_chapter)) * 100
-        else:
-            percentage = 0
+        percentage = self.session.percentage
             
         # --- EASTER EGGS (Synchronisés : Image choisit le Son) ---
         if self.easter_egg_enabled_var.get():
             score_bracket = int((percentage // 10) * 10)
-            prefix = f"score_{score_bracket}"
-            
-            img_dir = os.path.join(self.base_dir, "Assets", "Images")
-            snd_dir = os.path.join(self.base_dir, "Assets", "Sounds")
             
-            # 1. On liste toutes les images valides pour ce palier de score
-            candidates = []
-            if os.path.exists(img_dir):
-                for filename in os.listdir(img_dir):
-                    # On vérifie si le fichier commence par "score_XX"
-                    if filename.startswith(prefix):
-                        # Sécurité : on vérifie le caractère juste après le nombre 
-                        # pour ne pas confondre score_10 avec score_100
-                        rest = filename[len(prefix):]
-                        if rest == "" or rest[0] in ['.', '_', '-']:
-                             # On accepte seulement les images
-                             if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif')):
-                                candidates.append(filename)
-            
-            # 2. Si on a trouvé des candidats, on en tire un au sort
-            if candidates:
-                chosen_image_file = random.choice(candidates)
-                
-                # On récupère le "nom de base" sans l'extension
-                base_name = os.path.splitext(chosen_image_file)[0]
+            # Image et son déjà indexés (et normalement préchargés pendant le quiz)
+            chosen = self.assets.take(score_bracket)
+            if chosen:
+                img_path, wav_path = chosen
                 
                 # A. Affichage de l'image
-                img_path = os.path.join(img_dir, chosen_image_file)
-                try:
-                    self.score_img = tk.PhotoImage(file=img_path)
-                    img_label = tk.Label(scrollable_frame, image=self.score_img, bg=theme['bg'])
+                self.score_img = self.assets.get_image(img_path)
+                if self.score_img is not None:
+                    img_label = self.themed(tk.Label(scrollable_frame, image=self.score_img, bg=theme['bg']), "frame")
                     img_label.pack(pady=20)
-                except Exception as e:
-                    print(f"Erreur chargement Image: {e}")
 
-                # B. Recherche et lecture du son ASSOCIE (Même nom + .wav)
-                wav_path = os.path.join(snd_dir, f"{base_name}.wav")
-                if os.path.exists(wav_path):
+                # B. Lecture du son ASSOCIE (Même nom + .wav)
+                if wav_path:
                      self.play_looping_sound(wav_path)
                 else:
-                    print(f"Aucun son trouvé pour accompagner : {base_name}")
+                    print(f"Aucun son trouvé pour accompagner : {os.path.basename(img_path)}")
 
         # Score & Temps
-        ttk.Label(scrollable_frame, text=f"Score final : {self.score}/{len(self.current_chapter)} ({int(percentage)}%)", font=TITLE_FONT).pack(pady=10)
+        ttk.Label(scrollable_frame, text=f"Score final : {self.session.score}/{len(self.session)} ({int(percentage)}%)", font=TITLE_FONT).pack(pady=10)
         
         if self.final_time:
             total_time = int(self.final_time)
@@ -796,38 +1130,39 @@ class QCMApp(tk.Tk):
     def return_to_main_menu(self):
         self.stop_sound()
             
+        self.stop_timer()
         self.clear_frame(self.quiz_frame)
         self.quiz_frame.pack_forget()
-        self.create_main_menu()
+        self.show_main_menu()
 
     def open_editor(self):
         editor = tk.Toplevel(self)
         editor.title("Éditeur de question")
         editor.geometry("600x700")
         theme = self.themes[self.theme_mode]
-        editor.configure(bg=theme['bg'])
+        self.themed(editor, "frame")
         
         lbl_style = {"bg": theme['bg'], "fg": theme['fg'], "font": ("Arial", 12, "bold")}
         
-        tk.Label(editor, text="Question :", **lbl_style).pack(anchor="w", padx=10, pady=5)
+        self.themed(tk.Label(editor, text="Question :", **lbl_style), "label").pack(anchor="w", padx=10, pady=5)
         txt_question = scrolledtext.ScrolledText(editor, height=5, font=("Arial", 12))
-        txt_question.insert("1.0", self.current_question_data["question"])
+        txt_question.insert("1.0", self.current_question_data.question)
         txt_question.pack(fill="x", padx=10)
 
-        tk.Label(editor, text="Options :", **lbl_style).pack(anchor="w", padx=10, pady=(10, 5))
+        self.themed(tk.Label(editor, text="Options :", **lbl_style), "label").pack(anchor="w", padx=10, pady=(10, 5))
         entries_options = []
         vars_correct = []
-        options_frame = tk.Frame(editor, bg=theme['bg'])
+        options_frame = self.themed(tk.Frame(editor, bg=theme['bg']), "frame")
         options_frame.pack(fill="x", padx=10)
 
-        current_opts = self.current_question_data["options"]
-        correct_answers = self.current_question_data["correct_answers"]
+        current_opts = self.current_question_data.options
+        correct_answers = self.current_question_data.correct_answers
 
         for i in range(5):
-            row_frame = tk.Frame(options_frame, bg=theme['bg'])
+            row_frame = self.themed(tk.Frame(options_frame, bg=theme['bg']), "frame")
             row_frame.pack(fill="x", pady=2)
             letter = chr(65 + i)
-            tk.Label(row_frame, text=f"{letter}.", font=("Arial", 12, "bold"), bg=theme['bg'], fg=theme['fg']).pack(side="left")
+            self.themed(tk.Label(row_frame, text=f"{letter}.", font=("Arial", 12, "bold"), bg=theme['bg'], fg=theme['fg']), "label").pack(side="left")
             entry = tk.Entry(row_frame, font=("Arial", 12))
             val = current_opts[i] if i < len(current_opts) else ""
             entry.insert(0, val)
@@ -835,7 +1170,7 @@ class QCMApp(tk.Tk):
             entries_options.append(entry)
             var = tk.BooleanVar(value=letter in correct_answers)
             vars_correct.append(var)
-            tk.Checkbutton(row_frame, text="Correcte", variable=var, bg=theme['bg'], fg=theme['fg'], selectcolor=theme['bg']).pack(side="right")
+            self.themed(tk.Checkbutton(row_frame, text="Correcte", variable=var, bg=theme['bg'], fg=theme['fg'], selectcolor=theme['bg']), "checkbutton").pack(side="right")
 
         def save_changes():
             new_q = txt_question.get("1.0", "end-1c").strip()
@@ -846,30 +1181,65 @@ class QCMApp(tk.Tk):
                 messagebox.showwarning("Erreur", "Remplir tous les champs.", parent=editor)
                 return
 
-            self.current_question_data["question"] = new_q
-            self.current_question_data["options"] = new_opts
-            self.current_question_data["correct_answers"] = new_correct
+            self.current_question_data.question = new_q
+            self.current_question_data.options = new_opts
+            self.current_question_data.correct_answers = new_correct
             
-            success, msg = backend.update_question_in_file(self.current_question_data, new_q, new_opts, new_correct)
-            if success:
-                editor.destroy()
-                self.show_question()
-            else:
-                messagebox.showerror("Erreur", msg, parent=editor)
+            backend.queue_question_update(self.persistence, self.current_question_data, new_q, new_opts, new_correct,
+                                          on_done=self.on_question_saved)
+            editor.destroy()
+            self.show_question()
 
-        btn_frame = tk.Frame(editor, bg=theme['bg'])
+        btn_frame = self.themed(tk.Frame(editor, bg=theme['bg']), "frame")
         btn_frame.pack(pady=20)
         tk.Button(btn_frame, text="Sauvegarder", command=save_changes, bg="#2ecc71", fg="white", font=BUTTON_FONT).pack(side="left", padx=10)
         tk.Button(btn_frame, text="Annuler", command=editor.destroy, bg="#e74c3c", fg="white", font=BUTTON_FONT).pack(side="left", padx=10)
 
+    # --- PERSISTANCE ---
+    def poll_persistence(self):
+        self.persistence.process_results()
+        self.after(100, self.poll_persistence)
+
+    def on_question_saved(self, result):
+        success, msg = result if isinstance(result, tuple) else (False, str(result))
+        if not success:
+            messagebox.showerror("Erreur", f"La modification n'a pas été enregistrée :\n{msg}", parent=self)
+
+    def switch_profile(self, profile):
+        """Change de profil : ferme les stats courantes et charge celles du nouveau profil"""
+        profile = profile.strip()
+        if profile == self.profile:
+            return
+        if not backend.PROFILE_RE.match(profile):
+            messagebox.showerror("Erreur", "Nom de profil invalide (lettres, chiffres, - et _).", parent=self)
+            self.profile_var.set(self.profile)
+            return
+        self.question_stats.close()
+        self.profile = profile
+        self.question_stats = backend.load_stats(writer=self.persistence, profile=profile)
+        self.profile_box.configure(values=sorted(set(self.profile_box.cget('values')) | {profile}))
+
+    def shutdown_persistence(self):
+        """Termine les écritures en attente (à la fermeture)"""
+        self.question_stats.close()
+        self.persistence.close()
+
     def update_timer(self):
-        if hasattr(self, 'start_time') and not hasattr(self, 'final_time'):
-            if not self.winfo_exists(): return
-            elapsed_time = int(time.time() - self.start_time)
-            hours, remainder = divmod(elapsed_time, 3600)
-            minutes, seconds = divmod(remainder, 60)
-            self.time_label_var.set(f"Temps écoulé : {hours}h {minutes}m {seconds}s")
-            self.after(1000, self.update_timer)
+        # final_time vaut None tant que le quiz est en cours (avant : hasattr, toujours vrai)
+        self.stop_timer()
+        if self.start_time is None or self.final_time is not None:
+            return
+        if not self.winfo_exists(): return
+        elapsed_time = int(time.monotonic() - self.start_time)
+        hours, remainder = divmod(elapsed_time, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        self.time_label_var.set(f"Temps écoulé : {hours}h {minutes}m {seconds}s")
+        self.timer_job = self.after(1000, self.update_timer)
+
+    def stop_timer(self):
+        if self.timer_job is not None:
+            self.after_cancel(self.timer_job)
+            self.timer_job = None
 
     def on_option_hover(self, idx):
         if not self.feedback_mode: self.option_frames[idx].configure(style="Hover.TFrame")
@@ -879,5 +1249,14 @@ class QCMApp(tk.Tk):
         for widget in frame.winfo_children(): widget.destroy()
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="QCM")
+    parser.add_argument("--instrument", action="store_true", help="chronométrer les chemins critiques (résumé à la sortie)")
+    parser.add_argument("--cprofile", metavar="FICHIER", help="écrire un profil cProfile")
+    args = parser.parse_args()
+    instrumentation.enable_from_env(args.instrument, args.cprofile)
+
     app = QCMApp()
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
+    app.clear_sound_cache()
+    app.shutdown_persistence()
\ No newline at end of file
@@ -1,102 +1,618 @@
 import os
+import re
+import sys
 import json
+import time
+import heapq
+import bisect
+import marshal
+import queue
 import random
+import threading
+from collections import deque, namedtuple
+from collections.abc import Mapping
 
-# Nom du fichier de stats
+from instrumentation import hot_path
+
+# Nom du fichier de stats, de son journal, et nb de réponses avant compaction
 STATS_FILE = "question_stats.json"
+JOURNAL_SUFFIX = ".journal"
+COMPACT_EVERY = 500
+
+# Stats séparées par profil : STATS_DIR/<profil>/STATS_FILE (+ journal)
+STATS_DIR = "profils"
+DEFAULT_PROFILE = "defaut"
+PROFILE_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# Répétition espacée (secondes, facteurs de facilité SM-2)
+DAY = 86400
+RELEARN_DELAY = 600
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+EASE_PENALTY = 0.2
+
+# Temps de réponse : bornes (s) des classes de l'histogramme par question (+ une classe au-delà),
+# et seuil au-delà duquel une question lente est proposée plus tôt
+LATENCY_BUCKETS = (1, 2, 3, 5, 8, 13, 20, 30, 45, 60, 90, 120)
+SLOW_SECONDS = 30
+SLOW_ADVANCE = DAY
+
+# Dossier (dans JSON/) des chapitres compilés, et version de leur format
+CACHE_DIR_NAME = "__qcmcache__"
+COMPILED_FORMAT = 2
+
+# Stockage des banques : "json" (un fichier par chapitre) ou "sqlite" (voir sqlite_store.py)
+STORAGE_BACKEND = os.environ.get("QCM_STORAGE", "json")
+SQLITE_DB_NAME = "questions.db"
+_sqlite_store = None
+
+# Modifications de questions en attente d'écriture, par fichier source
+_pending_edits = {}
+_pending_edits_lock = threading.Lock()
+
+# Fonctions appelées à chaque modification de question (ex. index de recherche)
+_edit_listeners = []
 
 def get_json_dir(base_path):
     """Retourne le chemin du dossier JSON"""
     return os.path.join(os.path.dirname(os.path.abspath(base_path)), "JSON")
 
+def get_cache_path(file_path):
+    """Chemin du fichier compilé associé à un chapitre JSON"""
+    directory, filename = os.path.split(file_path)
+    return os.path.join(directory, CACHE_DIR_NAME, os.path.splitext(filename)[0] + ".qcmc")
+
+def get_cache_header(file_path):
+    """Clé d'invalidation du cache : format, interpréteur, chemin, date et taille du JSON"""
+    st = os.stat(file_path)
+    return (COMPILED_FORMAT, sys.implementation.cache_tag, os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+
+def compile_chapter(file_path, chapter_data):
+    """Écrit la version compilée (marshal) d'un chapitre à côté du JSON"""
+    header = get_cache_header(file_path)
+    rows = question_rows(chapter_data)
+    cache_path = get_cache_path(file_path)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(marshal.dumps((header, rows)))
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Cache non écrit pour {file_path}: {e}")
+
+def read_compiled_chapter(file_path):
+    """Lit les lignes compilées d'un chapitre, ou None si absentes ou périmées"""
+    try:
+        expected_header = get_cache_header(file_path)
+        with open(get_cache_path(file_path), "rb") as f:
+            header, rows = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if header != expected_header:
+        return None
+    return rows
+
+@hot_path
+def load_chapter(file_path):
+    """Charge un chapitre (version compilée si à jour, sinon JSON puis compilation)"""
+    rows = read_compiled_chapter(file_path)
+    if rows is None:
+        with open(file_path, "r", encoding="utf-8") as f:
+            chapter_data = json.load(f)
+        compile_chapter(file_path, chapter_data)
+        rows = question_rows(chapter_data)
+    return make_records(rows, file_path)
+
+# --- QUESTIONS EN MÉMOIRE ---
+# Chemins des fichiers sources, internés : une seule chaîne par banque
+_sources = []
+_source_ids = {}
+
+def intern_source(file_path):
+    """Retourne l'identifiant entier d'un fichier source"""
+    source_id = _source_ids.get(file_path)
+    if source_id is None:
+        source_id = _source_ids[file_path] = len(_sources)
+        _sources.append(sys.intern(file_path))
+    return source_id
+
+class QuestionRecord:
+    """Question en mémoire : attributs fixes (__slots__), source internée et clés précalculées.
+
+    S'utilise comme l'ancien dictionnaire (q["question"], q.get("id"), q["options"] = ...).
+    `key` est la clé des stats ("source|id"), `uid` un entier unique (source, position).
+    """
+    __slots__ = ("chapitre", "id", "question", "options", "correct_answers", "source_id", "key", "uid")
+    FIELDS = ("chapitre", "id", "question", "options", "correct_answers")
+
+    def __init__(self, chapitre, q_id, question, options, correct_answers, source_id, position):
+        self.chapitre = chapitre
+        self.id = q_id
+        self.question = question
+        self.options = options
+        self.correct_answers = correct_answers
+        self.source_id = source_id
+        self.key = f"{_sources[source_id]}|{q_id}"
+        self.uid = (source_id << 32) | position
+
+    @property
+    def source_file(self):
+        return _sources[self.source_id]
+
+    def __getitem__(self, name):
+        if name in self.FIELDS or name == "source_file":
+            return getattr(self, name)
+        raise KeyError(name)
+
+    def __setitem__(self, name, value):
+        if name not in self.FIELDS:
+            raise KeyError(name)
+        setattr(self, name, value)
+
+    def __contains__(self, name):
+        return name in self.FIELDS or name == "source_file"
+
+    def get(self, name, default=None):
+        return self[name] if name in self else default
+
+    def __repr__(self):
+        return f"QuestionRecord({self.key!r})"
+
+def question_rows(chapter_data):
+    """Convertit une liste de questions JSON en lignes compactes (tuples)"""
+    return tuple(
+        (q.get("chapitre"), q.get("id"), q.get("question"), tuple(q.get("options", [])), tuple(q.get("correct_answers", [])))
+        for q in chapter_data
+    )
+
+def make_records(rows, file_path):
+    """Construit les QuestionRecord d'un chapitre à partir de ses lignes"""
+    source_id = intern_source(file_path)
+    return [
+        QuestionRecord(chapitre, q_id, question, options, correct_answers, source_id, position)
+        for position, (chapitre, q_id, question, options, correct_answers) in enumerate(rows)
+    ]
+
+class ChapterStore(Mapping):
+    """Dictionnaire {fichier: questions} dont les chapitres sont chargés au premier accès"""
+
+    def __init__(self, chapter_files, loader=None):
+        self._files = list(chapter_files)
+        self._loader = loader or load_chapter
+        self._known = set(self._files)
+        self._loaded = {}
+        self._id_indexes = {}
+
+    def __getitem__(self, file_path):
+        if file_path not in self._known:
+            raise KeyError(file_path)
+        chapter_data = self._loaded.get(file_path)
+        if chapter_data is None:
+            try:
+                chapter_data = self._loader(file_path)
+            except Exception as e:
+                print(f"Erreur lors du chargement de {file_path}: {e}")
+                chapter_data = []
+            self._loaded[file_path] = chapter_data
+        return chapter_data
+
+    def __contains__(self, file_path):
+        return file_path in self._known
+
+    def __iter__(self):
+        return iter(self._files)
+
+    def __len__(self):
+        return len(self._files)
+
+    def id_index(self, file_path):
+        """Retourne {id (texte): question} pour un chapitre (construit au premier appel)"""
+        index = self._id_indexes.get(file_path)
+        if index is None:
+            index = {}
+            for question in self[file_path]:
+                index.setdefault(str(question.get("id")), question)
+            self._id_indexes[file_path] = index
+        return index
+
+def get_sqlite_store(json_dir):
+    """Ouvre la base SQLite à côté du dossier JSON. Les fichiers JSON ajoutés ou modifiés
+    depuis le dernier lancement sont (ré)importés."""
+    global _sqlite_store
+    if _sqlite_store is None:
+        import sqlite_store
+        db_path = os.path.join(os.path.dirname(os.path.abspath(json_dir)), SQLITE_DB_NAME)
+        _sqlite_store = sqlite_store.SQLiteStore(db_path)
+        if os.path.exists(json_dir):
+            _sqlite_store.sync_json_dir(json_dir)
+    return _sqlite_store
+
+@hot_path
 def load_chapters(json_dir):
-    """Charge tous les chapitres JSON du dossier spécifié"""
-    chapter_files = []
-    chapters_data = {}
-    
-    if os.path.exists(json_dir):
-        files = [f for f in os.listdir(json_dir) if f.endswith('.json')]
-        files.sort()
-        chapter_files = [os.path.join(json_dir, f) for f in files]
-    else:
+    """Liste les chapitres JSON du dossier spécifié (chargés à la demande)"""
+    if STORAGE_BACKEND == "sqlite":
+        store = get_sqlite_store(json_dir)
+        chapter_files = store.list_banks()
+        loader = lambda file_path: make_records(question_rows(store.load_bank(file_path)), file_path)
+        return chapter_files, ChapterStore(chapter_files, loader=loader)
+
+    if not os.path.exists(json_dir):
         print(f"Erreur : Le dossier {json_dir} est introuvable.")
         return [], {}
 
-    for file_path in chapter_files:
+    files = [f for f in os.listdir(json_dir) if f.endswith('.json')]
+    files.sort()
+    chapter_files = [os.path.join(json_dir, f) for f in files]
+    return chapter_files, ChapterStore(chapter_files)
+
+def atomic_write_json(path, data, **dump_kwargs):
+    """Écrit un JSON via un fichier temporaire puis renommage (jamais de fichier tronqué)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, **dump_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+class StatsStore(dict):
+    """Statistiques {clé: {"correct", "incorrect"}} persistées en journal + instantané.
+
+    Chaque réponse est ajoutée en une ligne au journal (coût constant). Le journal
+    est régulièrement fusionné dans l'instantané du profil par un thread, avec un
+    numéro de séquence pour ne jamais rejouer deux fois une même réponse.
+    """
+
+    def __init__(self, path=STATS_FILE, writer=None):
+        super().__init__()
+        self.path = path
+        self.writer = writer
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.rotated_path = self.journal_path + ".1"
+        self.seq = 0
+        self._records_since_compaction = 0
+        self._journal = None
+        self._journal_needs_newline = False
+        self._lock = threading.Lock()
+        self._compactor = None
+        # Index secondaires tenus à jour à chaque réponse : {source: {ids}}
+        self.errors_by_source = {}
+        self.seen_by_source = {}
+        # Questions jamais vues, construit par chapitre à la première demande (voir unseen_ids)
+        self.unseen_by_source = {}
+
+    # --- INDEX ---
+    def _index(self, key, q_stats):
+        source, _, q_id = key.rpartition("|")
+        self.seen_by_source.setdefault(source, set()).add(q_id)
+        unseen = self.unseen_by_source.get(source)
+        if unseen is not None:
+            unseen.discard(q_id)
+        if q_stats.get("incorrect", 0) > 0:
+            self.errors_by_source.setdefault(source, set()).add(q_id)
+
+    def unseen_ids(self, source, ids):
+        """Ids jamais répondus d'un chapitre. `ids` (tous les ids du chapitre) n'est parcouru
+        qu'au premier appel : ensuite l'index est tenu à jour par les réponses."""
+        unseen = self.unseen_by_source.get(source)
+        if unseen is None:
+            seen = self.seen_by_source.get(source, ())
+            unseen = self.unseen_by_source[source] = {q_id for q_id in ids if q_id not in seen}
+        return unseen
+
+    # --- CHARGEMENT ---
+    def load(self):
+        snapshot_seq = 0
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict) and "seq" in data and isinstance(data.get("stats"), dict):
+                    snapshot_seq = data["seq"]
+                    data = data["stats"]
+                self.update(data)
+                for key, q_stats in data.items():
+                    self._index(key, q_stats)
+            except Exception as e:
+                print(f"Erreur lecture stats: {e}")
+        self.seq = snapshot_seq
+        for journal_path in (self.rotated_path, self.journal_path):
+            self._replay(journal_path, snapshot_seq)
+        return self
+
+    def _replay(self, journal_path, snapshot_seq):
+        if not os.path.exists(journal_path):
+            return
+        with open(journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if journal_path == self.journal_path:
+                    self._journal_needs_newline = not line.endswith("\n")
+                try:
+                    record = json.loads(line)
+                    seq, key, is_correct = record["s"], record["k"], record["ok"]
+                    answered_at = record.get("t", 0)
+                    elapsed = record["ms"] / 1000 if "ms" in record else None
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue  # Dernière ligne tronquée par un arrêt brutal
+                if seq <= snapshot_seq:
+                    continue
+                self._apply(key, is_correct, answered_at, elapsed)
+                self.seq = max(self.seq, seq)
+                self._records_since_compaction += 1
+
+    def _apply(self, key, is_correct, now, elapsed=None):
+        q_stats = self.get(key)
+        if q_stats is None:
+            q_stats = self[key] = {"correct": 0, "incorrect": 0}
+        apply_answer(q_stats, is_correct, now)
+        if elapsed is not None:
+            apply_latency(q_stats, elapsed)
+        self._index(key, q_stats)
+        return q_stats
+
+    # --- ÉCRITURE ---
+    def record(self, key, is_correct, now=None, elapsed=None):
+        """Enregistre une réponse (et son temps de réponse en secondes) en mémoire et au journal"""
+        now = int(time.time()) if now is None else now
+        with self._lock:
+            q_stats = self._apply(key, is_correct, now, elapsed)
+            self.seq += 1
+            record = {"s": self.seq, "k": key, "ok": int(is_correct), "t": now}
+            if elapsed is not None:
+                record["ms"] = round(elapsed * 1000)
+            line = json.dumps(record) + "\n"
+            self._records_since_compaction += 1
+        if self.writer is not None:
+            self.writer.submit(None, self._append, line)
+        else:
+            self._append(line)
+        if self._records_since_compaction >= COMPACT_EVERY:
+            self.compact()
+        return q_stats
+
+    def _append(self, line):
+        with self._lock:
+            try:
+                if self._journal is None:
+                    self._journal = open(self.journal_path, "a", encoding="utf-8")
+                    if self._journal_needs_newline:
+                        self._journal.write("\n")
+                        self._journal_needs_newline = False
+                self._journal.write(line)
+                self._journal.flush()
+            except OSError as e:
+                print(f"Erreur journal stats: {e}")
+
+    def compact(self):
+        """Fusionne le journal dans l'instantané, en arrière-plan"""
+        if self.writer is not None:
+            self.writer.submit(("compact", self.path), self._compact)
+            return
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self._compact, name="stats-compaction")
+        self._compactor.start()
+
+    @hot_path
+    def _compact(self):
+        with self._lock:
+            # Si un ancien journal existe encore (compaction interrompue), l'instantané le couvre aussi
+            if not os.path.exists(self.rotated_path):
+                if self._journal is not None:
+                    self._journal.close()
+                    self._journal = None
+                if os.path.exists(self.journal_path):
+                    os.replace(self.journal_path, self.rotated_path)
+            snapshot = {"seq": self.seq, "stats": {k: dict(v) for k, v in self.items()}}
+            self._records_since_compaction = 0
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                chapter_data = json.load(f)
-                # On s'assure que chaque question connait son fichier source
-                for question in chapter_data:
-                    question["source_file"] = file_path
-                chapters_data[file_path] = chapter_data
+            atomic_write_json(self.path, snapshot)
+            if os.path.exists(self.rotated_path):
+                os.remove(self.rotated_path)
         except Exception as e:
-            print(f"Erreur lors du chargement de {file_path}: {e}")
-            
-    return chapter_files, chapters_data
+            print(f"Erreur sauvegarde stats: {e}")
 
-def load_stats():
-    """Charge les statistiques depuis le fichier JSON"""
-    if os.path.exists(STATS_FILE):
-        try:
-            with open(STATS_FILE, "r") as f:
-                return json.load(f)
-        except:
-            return {}
-    return {}
+    def close(self):
+        """Attend la fin d'une compaction en cours et ferme le journal"""
+        if self.writer is not None:
+            self.writer.flush()
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+# --- PROFILS ---
+def get_profile():
+    """Profil actif : variable d'environnement QCM_PROFILE, sinon le profil par défaut"""
+    return os.environ.get("QCM_PROFILE", DEFAULT_PROFILE)
+
+def get_stats_path(profile, stats_dir=STATS_DIR):
+    """Chemin de l'instantané des stats d'un profil (un dossier par profil)"""
+    if not isinstance(profile, str) or not PROFILE_RE.match(profile):
+        raise ValueError(f"Nom de profil invalide : {profile!r}")
+    return os.path.join(stats_dir, profile, STATS_FILE)
 
+def list_profiles(stats_dir=STATS_DIR):
+    """Profils existants, triés par nom"""
+    if not os.path.isdir(stats_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(stats_dir)
+        if PROFILE_RE.match(name) and os.path.isdir(os.path.join(stats_dir, name))
+    )
+
+def migrate_legacy_stats(path):
+    """Déplace l'ancien question_stats.json global (et son journal) vers un profil"""
+    if os.path.exists(path) or not os.path.exists(STATS_FILE):
+        return
+    for suffix in ("", JOURNAL_SUFFIX, JOURNAL_SUFFIX + ".1"):
+        if os.path.exists(STATS_FILE + suffix):
+            os.replace(STATS_FILE + suffix, path + suffix)
+
+def load_stats(writer=None, profile=None, stats_dir=STATS_DIR):
+    """Charge les statistiques d'un profil (instantané + journal des réponses).
+    Seuls les fichiers du profil sont lus : le coût ne dépend pas des autres profils.
+    Avec un PersistenceWorker, les écritures se font hors du thread appelant."""
+    profile = get_profile() if profile is None else profile
+    path = get_stats_path(profile, stats_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if profile == DEFAULT_PROFILE and stats_dir == STATS_DIR:
+        migrate_legacy_stats(path)
+    return StatsStore(path, writer=writer).load()
+
+@hot_path
 def save_stats(stats):
-    """Sauvegarde les statistiques"""
+    """Sauvegarde les statistiques (compaction du journal en arrière-plan)"""
+    if isinstance(stats, StatsStore):
+        stats.compact()
+        return
     try:
-        with open(STATS_FILE, "w") as f:
-            json.dump(stats, f)
+        atomic_write_json(STATS_FILE, stats)
     except Exception as e:
         print(f"Erreur sauvegarde stats: {e}")
 
+def record_answer(stats, key, is_correct, now=None, elapsed=None):
+    """Enregistre le résultat d'une réponse (et son temps en secondes) et retourne les stats de la question"""
+    if isinstance(stats, StatsStore):
+        return stats.record(key, is_correct, now, elapsed)
+    q_stats = stats.get(key, {"correct": 0, "incorrect": 0})
+    apply_answer(q_stats, is_correct, int(time.time()) if now is None else now)
+    if elapsed is not None:
+        apply_latency(q_stats, elapsed)
+    stats[key] = q_stats
+    return q_stats
+
+# --- RÉPÉTITION ESPACÉE ---
+def apply_answer(q_stats, is_correct, now):
+    """Met à jour compteurs et échéance de révision d'une question (SM-2 simplifié).
+
+    Une bonne réponse espace la révision suivante (1 jour, 6 jours, puis
+    intervalle × facteur de facilité) ; une erreur fait revenir la question
+    rapidement et baisse son facteur de facilité.
+    """
+    ease = q_stats.get("ease", DEFAULT_EASE)
+    if is_correct:
+        q_stats["correct"] += 1
+        reps = q_stats.get("reps", 0) + 1
+        if reps == 1:
+            interval = DAY
+        elif reps == 2:
+            interval = 6 * DAY
+        else:
+            interval = int(q_stats.get("interval", DAY) * ease)
+    else:
+        q_stats["incorrect"] += 1
+        reps = 0
+        interval = RELEARN_DELAY
+        ease = max(MIN_EASE, ease - EASE_PENALTY)
+    q_stats["reps"] = reps
+    q_stats["ease"] = round(ease, 2)
+    q_stats["interval"] = interval
+    q_stats["due"] = now + interval
+    return q_stats
+
+# --- TEMPS DE RÉPONSE ---
+def apply_latency(q_stats, elapsed):
+    """Ajoute un temps de réponse (s) aux agrégats de la question : nombre, moyenne, histogramme.
+    L'histogramme est remplacé (pas modifié en place) : un instantané en cours d'écriture reste cohérent."""
+    mean = q_stats.get("rt_mean", 0.0)
+    count = q_stats.get("rt_n", 0) + 1
+    q_stats["rt_n"] = count
+    q_stats["rt_mean"] = round(mean + (elapsed - mean) / count, 2)
+    hist = q_stats.get("rt_hist")
+    hist = list(hist) if hist else [0] * (len(LATENCY_BUCKETS) + 1)
+    hist[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+    q_stats["rt_hist"] = hist
+    return q_stats
+
+def latency_percentile(hist, fraction):
+    """Percentile approché (borne haute de la classe) à partir de l'histogramme"""
+    total = sum(hist)
+    if not total:
+        return None
+    threshold = fraction * total
+    seen = 0
+    for i, count in enumerate(hist):
+        seen += count
+        if seen >= threshold:
+            return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else float("inf")
+    return float("inf")
+
+def latency_summary(q_stats):
+    """{"count", "mean", "p50", "p90", "p99"} en secondes, ou None si jamais chronométrée"""
+    if not q_stats or not q_stats.get("rt_n"):
+        return None
+    hist = q_stats["rt_hist"]
+    return {
+        "count": q_stats["rt_n"], "mean": q_stats["rt_mean"],
+        "p50": latency_percentile(hist, 0.5), "p90": latency_percentile(hist, 0.9),
+        "p99": latency_percentile(hist, 0.99),
+    }
+
 def get_question_key(question_data):
     """Génère une clé unique pour une question (Source + ID)"""
+    if isinstance(question_data, QuestionRecord):
+        return question_data.key
     source = question_data.get("source_file", "unknown")
     q_id = question_data.get("id", "0")
     return f"{source}|{q_id}"
 
+@hot_path
 def smart_select_questions(question_list, number_to_select, stats):
-    """Sélectionne intelligemment les questions (priorité aux erreurs/non vues)"""
-    # Copie pour ne pas modifier la liste originale
-    shuffled_list = list(question_list)
-    random.shuffle(shuffled_list)
+    """Sélectionne les questions à réviser en priorité (non vues, puis échéance dépassée,
+    les questions lentes avant les autres). Sélection partielle par tas : O(n log k) pour k questions parmi n."""
+    stats_get = stats.get
+    rand = random.random
 
-    def get_seen_count(q):
-        key = get_question_key(q)
-        q_stats = stats.get(str(key), {"correct": 0, "incorrect": 0})
-        # On peut pondérer ici : une erreur "pèse" moins lourd qu'une réussite
-        # pour qu'on retombe dessus plus vite, mais restons simple pour l'instant:
-        # On trie par nombre total de vues (moins vue = prioritaire)
-        return q_stats["correct"] + q_stats["incorrect"]
+    def priority(q):
+        # Échéance la plus ancienne d'abord (jamais vue = échéance 0 ; une question lente
+        # est avancée de SLOW_ADVANCE), puis nombre de vues (stats antérieures au
+        # planificateur), puis tirage au sort
+        q_stats = stats_get(q.key if q.__class__ is QuestionRecord else get_question_key(q))
+        if q_stats is None:
+            return (0, 0, rand())
+        due = q_stats.get("due", 0)
+        if q_stats.get("rt_mean", 0) >= SLOW_SECONDS:
+            due -= SLOW_ADVANCE
+        return (due, q_stats["correct"] + q_stats["incorrect"], rand())
 
-    shuffled_list.sort(key=get_seen_count)
-    
-    return shuffled_list[:min(number_to_select, len(shuffled_list))]
+    return heapq.nsmallest(number_to_select, question_list, key=priority)
 
-def update_question_in_file(question_data, new_q, new_opts, new_correct):
-    """Met à jour une question directement dans le fichier source JSON"""
-    source_file = question_data.get("source_file")
+@hot_path
+def write_question_edits(source_file, edits):
+    """Applique {id: (question, options, réponses)} à une banque en une seule écriture"""
+    if STORAGE_BACKEND == "sqlite":
+        try:
+            store = get_sqlite_store(os.path.dirname(source_file))
+            found = [q_id for q_id, edit in edits.items() if store.update_question(source_file, q_id, *edit)]
+            if found:
+                return True, f"Sauvegardé dans {os.path.basename(store.db_path)}"
+            return False, "Question non trouvée dans la base."
+        except Exception as e:
+            return False, str(e)
     if source_file and os.path.exists(source_file):
         try:
             with open(source_file, "r", encoding="utf-8") as f:
                 full_data = json.load(f)
             
-            found = False
-            for idx, q in enumerate(full_data):
-                if q["id"] == question_data["id"]:
-                    full_data[idx]["question"] = new_q
-                    full_data[idx]["options"] = new_opts
-                    full_data[idx]["correct_answers"] = new_correct
-                    found = True
-                    break
+            remaining = dict(edits)
+            for q in full_data:
+                edit = remaining.pop(q["id"], None)
+                if edit is not None:
+                    q["question"], q["options"], q["correct_answers"] = edit
+                    if not remaining:
+                        break
             
-            if found:
-                with open(source_file, "w", encoding="utf-8") as f:
-                    json.dump(full_data, f, indent=4, ensure_ascii=False)
+            if len(remaining) < len(edits):
+                atomic_write_json(source_file, full_data, indent=4, ensure_ascii=False)
+                # Seul le cache de ce chapitre est régénéré
+                compile_chapter(source_file, full_data)
                 return True, f"Sauvegardé dans {os.path.basename(source_file)}"
             else:
                 return False, "Question non trouvée dans le fichier source."
@@ -104,6 +620,146 @@ def update_question_in_file(question_data, new_q, new_opts, new_correct):
             return False, str(e)
     return False, "Fichier source introuvable."
 
+def add_edit_listener(listener):
+    """Enregistre listener(question_data, new_q, new_opts), appelé à chaque modification"""
+    _edit_listeners.append(listener)
+
+def notify_question_edit(question_data, new_q, new_opts):
+    """Prévient les listeners d'une modification enregistrée (appelé après l'écriture réussie)"""
+    for listener in _edit_listeners:
+        listener(question_data, new_q, new_opts)
+
+@hot_path
+def update_question_in_file(question_data, new_q, new_opts, new_correct):
+    """Met à jour une question directement dans le fichier source JSON"""
+    edit = (new_q, new_opts, new_correct)
+    success, msg = write_question_edits(question_data.get("source_file"), {question_data["id"]: edit})
+    if success:
+        notify_question_edit(question_data, new_q, new_opts)
+    return success, msg
+
+def _flush_question_edits(source_file):
+    with _pending_edits_lock:
+        edits = _pending_edits.pop(source_file, {})
+    if not edits:
+        return True, "Aucune modification en attente."
+    return write_question_edits(source_file, edits)
+
+def queue_question_update(worker, question_data, new_q, new_opts, new_correct, on_done=None):
+    """Comme update_question_in_file, mais l'écriture est faite par le PersistenceWorker.
+    Plusieurs modifications d'une même banque en attente donnent une seule écriture.
+    Les listeners sont prévenus une fois l'écriture réussie, par worker.process_results()."""
+    def saved(result):
+        if isinstance(result, tuple) and result[0]:
+            notify_question_edit(question_data, new_q, new_opts)
+        if on_done is not None:
+            on_done(result)
+
+    source_file = question_data.get("source_file")
+    with _pending_edits_lock:
+        _pending_edits.setdefault(source_file, {})[question_data["id"]] = (new_q, new_opts, new_correct)
+    worker.submit(("bank", source_file), _flush_question_edits, source_file, on_done=saved)
+
+class PersistenceWorker:
+    """Thread unique d'écriture sur disque.
+
+    Les tâches s'exécutent dans l'ordre de soumission. Une tâche soumise avec une clé
+    encore en attente remplace la précédente (écritures fusionnées). Les callbacks
+    on_done(résultat) sont appelés par process_results(), depuis le thread appelant
+    (la boucle Tk via after()).
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._pending = {}
+        self._busy = False
+        self._results = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="persistence", daemon=True)
+        self._thread.start()
+
+    def submit(self, key, fn, *args, on_done=None):
+        with self._cond:
+            entry = self._pending.get(key) if key is not None else None
+            if entry is None:
+                entry = [key, fn, args, []]
+                self._queue.append(entry)
+                if key is not None:
+                    self._pending[key] = entry
+            else:
+                entry[1], entry[2] = fn, args
+            if on_done is not None:
+                entry[3].append(on_done)
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                key, fn, args, callbacks = self._queue.popleft()
+                if key is not None:
+                    del self._pending[key]
+                self._busy = True
+            if fn is None:
+                break
+            try:
+                result = fn(*args)
+            except Exception as e:
+                print(f"Erreur d'écriture en arrière-plan: {e}")
+                result = e
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+            for callback in callbacks:
+                self._results.put((callback, result))
+
+    def process_results(self):
+        """Appelle les callbacks des tâches terminées (à appeler depuis le thread de l'interface)"""
+        while True:
+            try:
+                callback, result = self._results.get_nowait()
+            except queue.Empty:
+                return
+            callback(result)
+
+    def flush(self, timeout=None):
+        """Attend que toutes les tâches soumises soient écrites"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def close(self, timeout=None):
+        self.flush(timeout)
+        self.submit(None, None)
+        self._thread.join(timeout)
+
+def get_error_questions(chapters, stats):
+    """Questions ayant au moins une erreur. Avec un StatsStore, on part de son index
+    d'erreurs : le coût dépend du nombre d'erreurs, pas de la taille de la bibliothèque."""
+    if not isinstance(stats, StatsStore) or not isinstance(chapters, ChapterStore):
+        all_questions = [q for chapter in chapters.values() for q in chapter]
+        return get_incorrect_questions(all_questions, stats)
+
+    error_questions = []
+    for source, ids in stats.errors_by_source.items():
+        if source not in chapters:
+            continue
+        index = chapters.id_index(source)
+        error_questions.extend(index[q_id] for q_id in ids if q_id in index)
+    return error_questions
+
+def get_unseen_questions(chapters, stats, chapter_files):
+    """Questions jamais répondues parmi les chapitres donnés. Avec un StatsStore et un
+    ChapterStore, le coût dépend du nombre de questions nouvelles (après le premier appel)."""
+    unseen = []
+    for file_path in chapter_files:
+        if isinstance(stats, StatsStore) and isinstance(chapters, ChapterStore):
+            index = chapters.id_index(file_path)
+            unseen.extend(index[q_id] for q_id in stats.unseen_ids(file_path, index) if q_id in index)
+        else:
+            unseen.extend(q for q in chapters[file_path] if get_question_key(q) not in stats)
+    return unseen
+
 def get_incorrect_questions(all_questions, stats):
     incorrect_questions = []
     
@@ -117,4 +773,86 @@ def get_incorrect_questions(all_questions, stats):
         if q_stats and q_stats.get("incorrect", 0) > 0:
             incorrect_questions.append(q)
             
-    return incorrect_questions
\ No newline at end of file
+    return incorrect_questions
+
+# --- SESSION DE QUIZ (sans interface) ---
+PresentedQuestion = namedtuple("PresentedQuestion", ["question", "options", "correct_answers"])
+
+class QuizSession:
+    """Déroulement d'un quiz indépendant de Tkinter : ordre des options, correction, score et stats.
+
+    L'interface (ou un script, un serveur, un benchmark) appelle present() pour la
+    question courante, answer() avec les lettres cochées, puis advance().
+    """
+
+    def __init__(self, questions, stats, shuffle_options=False, rng=None, clock=time.monotonic):
+        self.questions = list(questions)
+        self.stats = stats
+        self.shuffle_options = shuffle_options
+        self.rng = rng or random
+        # Horloge monotone : le temps de réponse va de present() à answer()
+        self.clock = clock
+        self.presented_at = None
+        self.index = 0
+        self.score = 0
+        self.answered = 0
+        self.current = None
+
+    @classmethod
+    def select(cls, question_list, number_to_select, stats, **kwargs):
+        """Nouvelle session sur les questions prioritaires (voir smart_select_questions)"""
+        return cls(smart_select_questions(question_list, number_to_select, stats), stats, **kwargs)
+
+    def __len__(self):
+        return len(self.questions)
+
+    @property
+    def finished(self):
+        return self.index >= len(self.questions)
+
+    @property
+    def remaining(self):
+        return len(self.questions) - self.index
+
+    @property
+    def percentage(self):
+        return (self.score / len(self.questions)) * 100 if self.questions else 0
+
+    def present(self):
+        """Prépare la question courante : options (mélangées si demandé) et lettres correctes"""
+        question = self.questions[self.index]
+        raw_options = question["options"]
+        raw_correct = question["correct_answers"]
+
+        if self.shuffle_options:
+            indexed_options = list(enumerate(raw_options))
+            self.rng.shuffle(indexed_options)
+            options = [text for _, text in indexed_options]
+            original_correct_indices = {ord(c) - 65 for c in raw_correct}
+            correct_answers = [chr(65 + new_index) for new_index, (old_index, _) in enumerate(indexed_options)
+                               if old_index in original_correct_indices]
+        else:
+            options = list(raw_options)
+            correct_answers = list(raw_correct)
+
+        self.current = PresentedQuestion(question, options, correct_answers)
+        self.presented_at = self.clock()
+        return self.current
+
+    def answer(self, selected_letters):
+        """Corrige la réponse (lettres cochées), met à jour score et stats, retourne True si juste"""
+        if self.current is None:
+            self.present()
+        elapsed = self.clock() - self.presented_at
+        is_correct = sorted(self.current.correct_answers) == sorted(selected_letters)
+        record_answer(self.stats, get_question_key(self.current.question), is_correct, elapsed=elapsed)
+        self.answered += 1
+        if is_correct:
+            self.score += 1
+        return is_correct
+
+    def advance(self):
+        """Passe à la question suivante, retourne False quand le quiz est terminé"""
+        self.index += 1
+        self.current = None
+        return not self.finished
@@ -0,0 +1,61 @@
+"""Benchmark : mémoire par question, dictionnaires (ancien format) contre QuestionRecord.
+
+Usage : python benchmarks/bench_memory.py [--questions 100000]
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backend
+
+SOURCE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "JSON", "Synth.json")
+
+
+def synthetic_rows(num_questions):
+    return [
+        (0, i + 1, f"Question synthétique numéro {i} : quelle est l'affirmation exacte ?",
+         tuple(f"option {letter} de la question {i}" for letter in "abcde"), ("A", "C"))
+        for i in range(num_questions)
+    ]
+
+
+def build_dicts(rows):
+    """Ancien format : un dict par question avec le chemin source complet"""
+    questions = []
+    for chapitre, q_id, question, options, correct_answers in rows:
+        questions.append({"chapitre": chapitre, "id": q_id, "question": question, "options": list(options),
+                          "correct_answers": list(correct_answers), "source_file": str(SOURCE_FILE)})
+    return questions
+
+
+def build_records(rows):
+    return backend.make_records(rows, SOURCE_FILE)
+
+
+def measure(builder, rows):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    questions = builder(rows)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, questions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=100000)
+    args = parser.parse_args()
+
+    # Les textes sont partagés par les deux formats : on mesure la structure autour
+    rows = synthetic_rows(args.questions)
+    print(f"{args.questions} questions")
+    for label, builder in (("dict", build_dicts), ("QuestionRecord", build_records)):
+        size, questions = measure(builder, rows)
+        print(f"{label:>15} : {size / 1e6:7.1f} Mo, {size / len(questions):6.0f} octets/question")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark : parseur en flux (create_json.iter_questions) contre l'ancien parseur quadratique.
+
+Usage : python benchmarks/bench_parser.py [--sizes 1000 10000 100000] [--legacy-max 10000]
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import create_json
+from synthetic import write_raw_bank
+
+
+def legacy_read_questions_and_answers(questions_filename, answers_filename):
+    """Copie de l'ancienne implémentation (q_lines.index pour chaque question)"""
+    stockllll = 0
+    questions = []
+    with open(questions_filename, 'r', encoding='utf-8') as q_file, open(answers_filename, 'r', encoding='utf-8') as a_file:
+        q_lines = q_file.readlines()
+        a_lines = a_file.readlines()
+
+        current_chapter = ""
+        answers = {}
+        for line in a_lines:
+            if line.startswith("Chapitre"):
+                current_chapter = line.strip()
+                answers[current_chapter] = []
+            elif line.strip() and current_chapter and line.strip()[0].isdigit():
+                answers[current_chapter].extend(line.strip().split(';')[:-1])
+
+        current_chapter = ""
+        question_count = 0
+        for line in q_lines:
+            if line.startswith("Chapitre"):
+                current_chapter = line.strip()
+                stockllll = stockllll + 1
+                question_count = 0
+            elif line.strip():
+                match = re.match(r'^(\d+)\.\s*(.*)', line)
+                if match:
+                    question_number = int(match.group(1))
+                    question = match.group(2).strip()
+                    options = [q_lines[q_lines.index(line) + i].strip() for i in range(1, 6) if q_lines.index(line) + i < len(q_lines)]
+
+                    if current_chapter in answers and question_number - 1 < len(answers[current_chapter]):
+                        correct_answers_raw = answers[current_chapter][question_number - 1].split('.')[1].strip()
+                        correct_answers = [i.strip() for i in correct_answers_raw.split(',') if i.strip()]
+                    else:
+                        correct_answers = []
+
+                    questions.append(create_json.Question(stockllll, question_count + 1, question, options, correct_answers))
+                    question_count += 1
+
+    return questions
+
+
+def strip_option_letters(questions):
+    """L'ancien parseur gardait les préfixes "a. " des options, retirés depuis par create_json.OPTION_RE"""
+    for question in questions:
+        question.options = [create_json.OPTION_RE.sub(r"\2", option) for option in question.options]
+    return questions
+
+
+def time_call(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--legacy-max", type=int, default=10000,
+                        help="taille maximale pour l'ancien parseur (quadratique)")
+    args = parser.parse_args()
+
+    print(f"{'questions':>10} {'flux (s)':>10} {'ancien (s)':>11} {'gain':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            q_path, r_path = write_raw_bank(tmp, size, name=f"Synth{size}")
+            new_time, new_result = time_call(create_json.read_questions_and_answers, q_path, r_path)
+            if size <= args.legacy_max:
+                old_time, old_result = time_call(legacy_read_questions_and_answers, q_path, r_path)
+                strip_option_letters(old_result)
+                if [q.to_dict() for q in old_result] != [q.to_dict() for q in new_result]:
+                    print(f"  ATTENTION : résultats différents pour {size} questions")
+                print(f"{size:>10} {new_time:>10.3f} {old_time:>11.3f} {old_time / new_time:>7.1f}x")
+            else:
+                print(f"{size:>10} {new_time:>10.3f} {'-':>11} {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
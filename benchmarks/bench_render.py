@@ -0,0 +1,99 @@
+"""Benchmark : latence d'affichage d'une question (QCMApp.show_question), écran requis.
+
+Lance un quiz sur le premier chapitre puis mesure show_question + update_idletasks
+pour chaque question, en avançant dans la session comme le fait l'application.
+
+Nécessite un écran (ne tourne pas en CI sans affichage) : les mesures avant / après
+de la vue de question réutilisée restent à relever sur un poste de travail.
+
+Avant / après une modification de l'interface :
+    git worktree add /tmp/qcm-avant <commit>
+    python benchmarks/bench_render.py --app-dir /tmp/qcm-avant --save /tmp/avant.json
+    python benchmarks/bench_render.py --baseline /tmp/avant.json
+
+Usage : python benchmarks/bench_render.py [--questions 200] [--app-dir DOSSIER] [--save F] [--baseline F]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def goto_question(app, i):
+    """Question i (modulo la taille du quiz) : via la session, ou current_question avant QuizSession"""
+    session = getattr(app, "session", None)
+    if session is not None:
+        session.index = i % len(session)
+        session.current = None
+    else:
+        app.current_question = i % len(app.current_chapter)
+
+
+def summary(timings):
+    timings = sorted(timings)
+    return {
+        "questions": len(timings),
+        "moyenne": statistics.mean(timings),
+        "médiane": timings[len(timings) // 2],
+        "p95": timings[int(len(timings) * 0.95)],
+        "max": timings[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--app-dir", default=BASE_DIR, help="version de QCM.py à mesurer (ex : un git worktree)")
+    parser.add_argument("--save", metavar="FICHIER", help="enregistrer les mesures (JSON)")
+    parser.add_argument("--baseline", metavar="FICHIER", help="comparer à des mesures enregistrées")
+    args = parser.parse_args()
+
+    app_dir = os.path.abspath(args.app_dir)
+    sys.path.insert(0, app_dir)
+    os.chdir(app_dir)
+    import QCM
+
+    try:
+        app = QCM.QCMApp()
+    except QCM.tk.TclError as e:
+        print(f"Pas d'affichage disponible ({e}) : benchmark non exécuté.")
+        return 2
+    app.update()
+    app.num_questions_var.set(args.questions)
+    app.start_quiz(0)
+    app.update()
+
+    timings = []
+    for i in range(args.questions):
+        goto_question(app, i)
+        start = time.perf_counter()
+        app.show_question()
+        app.update_idletasks()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    app.destroy()
+    app.shutdown_persistence()
+
+    result = summary(timings)
+    reference = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            reference = json.load(f)
+    print(f"{result['questions']} questions affichées ({app_dir})")
+    for name in ("moyenne", "médiane", "p95", "max"):
+        line = f"{name:>8s} {result[name]:8.2f} ms"
+        if reference:
+            line += f"   avant {reference[name]:8.2f} ms   {result[name] / reference[name] - 1:+6.0%}"
+        print(line)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
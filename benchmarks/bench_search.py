@@ -0,0 +1,79 @@
+"""Benchmark : index de recherche plein texte (search_index.SearchIndex).
+
+Usage : python benchmarks/bench_search.py [--questions 100000] [--queries 2000]
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backend
+from search_index import SearchIndex
+
+WORDS = (
+    "injection intramusculaire sous-cutanée intraveineuse pression artérielle élevée diminuée "
+    "fréquence cardiaque débit rénal filtration glomérulaire hormone thyroïdienne insuline "
+    "glycémie cortisol œdème pulmonaire ventilation alvéolaire hémoglobine plaquettes "
+    "coagulation nerf vague muscle squelettique lisse potentiel d'action membrane canal "
+    "sodium potassium calcium récepteur muscarinique nicotinique adrénaline noradrénaline"
+).split()
+
+
+def synthetic_vocabulary(size, rng):
+    """Mots réels + mots inventés, avec des poids de Zipf (quelques mots très fréquents)"""
+    syllables = ["ca", "ré", "ti", "no", "mu", "lè", "pha", "gly", "cor", "thy", "vé", "ne", "sti", "qu"]
+    invented = {"".join(rng.choices(syllables, k=rng.randint(2, 5))) for _ in range(size)}
+    vocabulary = WORDS + sorted(invented)
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    return vocabulary, cum_weights
+
+
+def synthetic_questions(num_questions, vocabulary, cum_weights, rng):
+    rows = [
+        (0, i + 1, " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=12)),
+         tuple(" ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=6)) for _ in range(5)), ("A",))
+        for i in range(num_questions)
+    ]
+    return backend.make_records(rows, os.path.join("JSON", "Synth.json"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'index de recherche")
+    parser.add_argument("--questions", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary, cum_weights = synthetic_vocabulary(20_000, rng)
+    questions = synthetic_questions(args.questions, vocabulary, cum_weights, rng)
+
+    start = time.perf_counter()
+    index = SearchIndex()
+    for question in questions:
+        index.add(question)
+    print(f"Construction : {args.questions} questions en {time.perf_counter() - start:.2f}s "
+          f"({len(index.postings)} mots)")
+
+    for label, make_query in (
+        ("1 mot", lambda: rng.choice(vocabulary)),
+        ("3 mots", lambda: " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=3))),
+        ("préfixe", lambda: rng.choice(vocabulary)[:4]),
+    ):
+        queries = [make_query() for _ in range(args.queries)]
+        timings = []
+        hits = 0
+        for query in queries:
+            t0 = time.perf_counter()
+            hits += len(index.search(query, limit=100))
+            timings.append(time.perf_counter() - t0)
+        timings.sort()
+        print(f"{label:8s}: médiane {timings[len(timings) // 2] * 1e6:8.1f} µs   "
+              f"p99 {timings[int(len(timings) * 0.99)] * 1e6:8.1f} µs   ({hits / len(queries):.0f} résultats)")
+
+
+if __name__ == "__main__":
+    main()
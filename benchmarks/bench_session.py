@@ -0,0 +1,69 @@
+"""Benchmark : sessions de quiz sans interface (backend.QuizSession), réponses simulées par minute.
+
+Usage : python benchmarks/bench_session.py [--answers 1000000] [--pool 300] [--per-session 20] [--journal]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backend
+
+
+def synthetic_pool(num_questions):
+    rows = [
+        (0, i + 1, f"Question synthétique {i}", tuple(f"option {letter}" for letter in "abcde"),
+         tuple(sorted(random.sample("ABCDE", random.randint(1, 3)))))
+        for i in range(num_questions)
+    ]
+    return backend.make_records(rows, os.path.join("JSON", "Synth.json"))
+
+
+def run(pool, stats, num_answers, per_session, shuffle, accuracy):
+    rng = random.Random(0)
+    answered = 0
+    sessions = 0
+    start = time.perf_counter()
+    while answered < num_answers:
+        session = backend.QuizSession.select(pool, per_session, stats, shuffle_options=shuffle, rng=rng)
+        sessions += 1
+        while True:
+            presented = session.present()
+            letters = presented.correct_answers if rng.random() < accuracy else ["A"]
+            session.answer(letters)
+            answered += 1
+            if not session.advance() or answered >= num_answers:
+                break
+    return answered, sessions, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--answers", type=int, default=1000000)
+    parser.add_argument("--pool", type=int, default=300, help="questions disponibles (taille d'un chapitre)")
+    parser.add_argument("--per-session", type=int, default=20)
+    parser.add_argument("--shuffle", action="store_true", help="mélanger les options")
+    parser.add_argument("--accuracy", type=float, default=0.7)
+    parser.add_argument("--journal", action="store_true", help="stats journalisées sur disque (StatsStore)")
+    args = parser.parse_args()
+
+    pool = synthetic_pool(args.pool)
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.journal:
+            stats = backend.StatsStore(os.path.join(tmp, "question_stats.json")).load()
+        else:
+            stats = {}
+        answered, sessions, elapsed = run(pool, stats, args.answers, args.per_session, args.shuffle, args.accuracy)
+        if args.journal:
+            stats.close()
+
+    print(f"{answered} réponses, {sessions} sessions en {elapsed:.2f} s")
+    print(f"{answered / elapsed * 60 / 1e6:.2f} millions de réponses par minute")
+
+
+if __name__ == "__main__":
+    main()
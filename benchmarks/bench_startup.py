@@ -0,0 +1,54 @@
+"""Benchmark : chargement des chapitres à froid (sans cache compilé) et à chaud.
+
+Usage : python benchmarks/bench_startup.py [--banks 40] [--questions 300]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backend
+from synthetic import write_json_banks
+
+
+def load_everything(json_dir):
+    """Démarrage puis chargement de tous les chapitres (pire cas : mélange/erreurs)"""
+    start = time.perf_counter()
+    chapter_files, chapters = backend.load_chapters(json_dir)
+    listed = time.perf_counter()
+    count = sum(len(chapters[f]) for f in chapter_files)
+    return listed - start, time.perf_counter() - start, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--banks", type=int, default=40)
+    parser.add_argument("--questions", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_dir = os.path.join(tmp, "JSON")
+        write_json_banks(json_dir, args.banks, args.questions)
+
+        shutil.rmtree(os.path.join(json_dir, backend.CACHE_DIR_NAME), ignore_errors=True)
+        cold = load_everything(json_dir)
+        warm = load_everything(json_dir)
+
+        # Édition d'une question : seul son chapitre doit être recompilé
+        chapter_files, chapters = backend.load_chapters(json_dir)
+        question = chapters[chapter_files[0]][0]
+        backend.update_question_in_file(question, "Question modifiée", question["options"], ["B"])
+        edited = load_everything(json_dir)
+
+    print(f"{args.banks} banques x {args.questions} questions ({cold[2]} questions)")
+    print(f"{'':>14} {'démarrage (s)':>14} {'tout charger (s)':>17}")
+    for label, (listed, total, _) in (("à froid", cold), ("à chaud", warm), ("après édition", edited)):
+        print(f"{label:>14} {listed:>14.4f} {total:>17.4f}")
+
+
+if __name__ == "__main__":
+    main()
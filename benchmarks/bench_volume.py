@@ -0,0 +1,94 @@
+"""Benchmark : réduction de volume d'un WAV 16 bits (QCM.scale_pcm16) contre l'ancienne boucle struct.
+
+Usage : python benchmarks/bench_volume.py [--seconds 60] [--volume 0.3]
+"""
+import argparse
+import math
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import QCM
+
+RATE = 44100
+CHANNELS = 2
+
+
+def legacy_scale(frames, volume):
+    """Ancienne implémentation (un objet Python par échantillon)"""
+    fmt = "<" + "h" * (len(frames) // 2)
+    samples = list(struct.unpack(fmt, frames))
+    samples = [int(s * volume) for s in samples]
+    return struct.pack(fmt, *samples)
+
+
+def write_test_wav(path, seconds):
+    """Écrit un WAV stéréo 16 bits (sinusoïde 440 Hz)"""
+    period = [int(20000 * math.sin(2 * math.pi * 440 * i / RATE)) for i in range(RATE)]
+    one_second = struct.pack("<" + "h" * (RATE * CHANNELS), *(s for s in period for _ in range(CHANNELS)))
+    with wave.open(path, "wb") as wav_out:
+        wav_out.setnchannels(CHANNELS)
+        wav_out.setsampwidth(2)
+        wav_out.setframerate(RATE)
+        for _ in range(seconds):
+            wav_out.writeframes(one_second)
+
+
+class _App:
+    """Le strict nécessaire de QCMApp pour appeler create_volume_adjusted_file"""
+    create_volume_adjusted_file = QCM.QCMApp.create_volume_adjusted_file
+    _create_volume_adjusted_file = QCM.QCMApp._create_volume_adjusted_file
+
+    def __init__(self):
+        self.volume_cache = {}
+        self.volume_lock = threading.Lock()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--volume", type=float, default=0.3)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        wav_path = os.path.join(tmp, "long.wav")
+        write_test_wav(wav_path, args.seconds)
+        with wave.open(wav_path, "rb") as wav_in:
+            frames = wav_in.readframes(wav_in.getnframes())
+        megabytes = len(frames) / 1e6
+        backend_name = "numpy" if QCM.numpy else "audioop" if QCM.audioop else "array"
+        print(f"WAV de {args.seconds} s ({megabytes:.1f} Mo), méthode : {backend_name}")
+
+        start = time.perf_counter()
+        QCM.scale_pcm16(frames, args.volume)
+        elapsed = time.perf_counter() - start
+        print(f"{'scale_pcm16':>28} : {elapsed:8.4f} s ({megabytes / elapsed:8.1f} Mo/s)")
+
+        if not args.skip_legacy:
+            start = time.perf_counter()
+            legacy_scale(frames, args.volume)
+            elapsed = time.perf_counter() - start
+            print(f"{'ancienne boucle struct':>28} : {elapsed:8.4f} s ({megabytes / elapsed:8.1f} Mo/s)")
+
+        app = _App()
+        for label in ("fichier (1er appel)", "fichier (cache)"):
+            start = time.perf_counter()
+            app.create_volume_adjusted_file(wav_path, args.volume)
+            print(f"{label:>28} : {time.perf_counter() - start:8.4f} s")
+        for temp_path in app.volume_cache.values():
+            os.remove(temp_path)
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Test de charge du serveur HTTP (server.py) : requêtes/seconde et latences p50/p99.
+
+Chaque client simulé garde une connexion keep-alive et enchaîne des quiz :
+/select puis un /grade par question, avec un /errors de temps en temps.
+
+Usage : python benchmarks/loadtest.py [--clients 50] [--duration 10] [--spawn]
+        (--spawn démarre server.py sur des banques synthétiques dans un dossier temporaire)
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from synthetic import write_json_banks
+
+
+async def request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    data = json.loads(await reader.readexactly(length))
+    if status != 200:
+        raise RuntimeError(f"{method} {path} -> {status}: {data}")
+    return data
+
+
+async def client(host, port, user, deadline, latencies, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def timed(method, path, payload=None):
+        start = time.perf_counter()
+        data = await request(reader, writer, method, path, payload)
+        latencies.append(time.perf_counter() - start)
+        return data
+
+    try:
+        while time.perf_counter() < deadline:
+            selected = await timed("POST", "/select", {"user": user, "count": 20})
+            for question in selected["questions"]:
+                letters = sorted(rng.sample("ABCDE", rng.randint(1, 2)))
+                await timed("POST", "/grade", {"user": user, "qid": question["qid"], "answers": letters})
+            if rng.random() < 0.2:
+                await timed("GET", f"/errors?user={user}")
+    finally:
+        writer.close()
+
+
+async def run(host, port, num_clients, duration):
+    latencies = []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, f"eleve{i}", deadline, latencies, random.Random(i)) for i in range(num_clients)
+    ))
+    return latencies, time.perf_counter() - start
+
+
+def wait_for_server(host, port, timeout=30):
+    async def probe():
+        reader, writer = await asyncio.open_connection(host, port)
+        await request(reader, writer, "GET", "/chapters")
+        writer.close()
+
+    deadline = time.time() + timeout
+    while True:
+        try:
+            asyncio.run(probe())
+            return
+        except OSError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--spawn", action="store_true", help="lancer server.py sur des banques synthétiques")
+    parser.add_argument("--chapters", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=300, help="questions par chapitre (--spawn)")
+    args = parser.parse_args()
+
+    server = None
+    tmp = None
+    if args.spawn:
+        tmp = tempfile.TemporaryDirectory()
+        json_dir = os.path.join(tmp.name, "JSON")
+        write_json_banks(json_dir, args.chapters, args.questions)
+        server = subprocess.Popen([
+            sys.executable, os.path.join(BASE_DIR, "server.py"), "--host", args.host, "--port", str(args.port),
+            "--json-dir", json_dir, "--stats-dir", os.path.join(tmp.name, "stats"),
+        ])
+    try:
+        wait_for_server(args.host, args.port)
+        latencies, elapsed = asyncio.run(run(args.host, args.port, args.clients, args.duration))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+            tmp.cleanup()
+
+    latencies.sort()
+    count = len(latencies)
+    p50 = latencies[count // 2] * 1000
+    p99 = latencies[min(count - 1, int(count * 0.99))] * 1000
+    print(f"{args.clients} clients, {count} requêtes en {elapsed:.1f}s")
+    print(f"{count / elapsed:,.0f} requêtes/s   p50 {p50:.2f} ms   p99 {p99:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
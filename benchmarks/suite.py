@@ -0,0 +1,152 @@
+"""Suite de benchmarks des fonctions critiques, sur données synthétiques de plusieurs tailles.
+
+Mesure read_questions_and_answers, iter_docx_questions, load_chapters (à froid / à chaud), smart_select_questions,
+get_incorrect_questions, update_question_in_file et save_stats, puis compare à une
+référence enregistrée (benchmarks/baseline.json) et signale les régressions.
+
+Usage : python benchmarks/suite.py [--sizes 1000 10000] [--repeat 5] [--save-baseline]
+        [--baseline FICHIER] [--threshold 0.25]
+Code de sortie 1 si une régression dépasse le seuil.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import backend
+import create_json
+from synthetic import write_docx_bank, write_json_banks, write_raw_bank, write_stats_history
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+QUESTIONS_PER_BANK = 500
+# Écart absolu en dessous duquel on ne parle pas de régression (bruit de mesure)
+MIN_DELTA = 0.001
+
+
+def best_of(repeat, func, setup=None):
+    """Meilleur temps sur `repeat` exécutions (setup() non chronométré avant chacune)"""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_size(size, repeat, tmp):
+    """Chronomètre chaque fonction pour une bibliothèque de `size` questions"""
+    root = os.path.join(tmp, str(size))
+    json_dir = os.path.join(root, "JSON")
+    num_banks = max(1, size // QUESTIONS_PER_BANK)
+    paths = write_json_banks(json_dir, num_banks, size // num_banks)
+    q_path, r_path = write_raw_bank(os.path.join(root, "RAW TXT"), size)
+    keys = [f"{path}|{i + 1}" for path in paths for i in range(size // num_banks)]
+    stats_path = os.path.join(root, backend.STATS_FILE)
+    stats = write_stats_history(stats_path, keys, size * 3)
+
+    results = {}
+    results["read_questions_and_answers"] = best_of(
+        repeat, lambda: create_json.read_questions_and_answers(q_path, r_path))
+    docx_path = write_docx_bank(os.path.join(root, "Data", "Synth.docx"), size)
+    results["iter_docx_questions"] = best_of(
+        repeat, lambda: list(create_json.iter_docx_questions(docx_path)))
+
+    def load_all():
+        chapter_files, chapters = backend.load_chapters(json_dir)
+        return [q for f in chapter_files for q in chapters[f]]
+
+    cache_dir = os.path.join(json_dir, backend.CACHE_DIR_NAME)
+    results["load_chapters (à froid)"] = best_of(
+        repeat, load_all, setup=lambda: shutil.rmtree(cache_dir, ignore_errors=True))
+    results["load_chapters (à chaud)"] = best_of(repeat, load_all)
+
+    all_questions = load_all()
+    results["smart_select_questions"] = best_of(
+        repeat, lambda: backend.smart_select_questions(all_questions, 20, stats))
+    results["get_incorrect_questions"] = best_of(
+        repeat, lambda: backend.get_incorrect_questions(all_questions, stats))
+
+    question = all_questions[0]
+    results["update_question_in_file"] = best_of(repeat, lambda: backend.update_question_in_file(
+        question, question["question"], list(question["options"]), list(question["correct_answers"])))
+
+    # save_stats écrit STATS_FILE dans le dossier courant (stats en dictionnaire simple)
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        results["save_stats"] = best_of(repeat, lambda: backend.save_stats(stats))
+    finally:
+        os.chdir(cwd)
+
+    store = backend.StatsStore(stats_path).load()
+    results["StatsStore.compact"] = best_of(repeat, store._compact)
+    store.close()
+    return results
+
+
+def machine():
+    return {"python": platform.python_version(), "platform": platform.platform(), "processor": platform.processor()}
+
+
+def compare(results, baseline, threshold):
+    """Affiche les temps et l'écart à la référence, retourne le nombre de régressions"""
+    regressions = 0
+    reference = baseline.get("results", {}) if baseline else {}
+    print(f"{'fonction':32s} {'taille':>8s} {'temps ms':>10s} {'réf. ms':>10s} {'écart':>8s}")
+    for size, timings in results.items():
+        for name, seconds in timings.items():
+            ref = reference.get(size, {}).get(name)
+            if ref is None:
+                print(f"{name:32s} {size:>8s} {seconds * 1000:10.2f} {'-':>10s} {'-':>8s}")
+                continue
+            ratio = seconds / ref - 1 if ref else 0.0
+            flag = ""
+            if ratio > threshold and seconds - ref > MIN_DELTA:
+                flag = "  RÉGRESSION"
+                regressions += 1
+            print(f"{name:32s} {size:>8s} {seconds * 1000:10.2f} {ref * 1000:10.2f} {ratio:+7.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="enregistrer ces mesures comme référence")
+    parser.add_argument("--threshold", type=float, default=0.25, help="ralentissement toléré (0.25 = +25 %%)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {str(size): run_size(size, args.repeat, tmp) for size in args.sizes}
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("machine") != machine():
+            print("Attention : la référence a été mesurée sur une autre machine / version de Python.")
+
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        backend.atomic_write_json(args.baseline, {"machine": machine(), "results": results}, indent=2)
+        print(f"Référence enregistrée dans {args.baseline}")
+    elif baseline is None:
+        print("Aucune référence : relancer avec --save-baseline pour en enregistrer une.")
+    elif regressions:
+        print(f"{regressions} régression(s) au-delà de +{args.threshold:.0%}")
+    return 1 if regressions and not args.save_baseline else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""Générateur de données synthétiques : banques JSON/, couples RAW TXT Q/R et historiques de stats.
+
+Usage : python benchmarks/synthetic.py DOSSIER [--banks 10] [--questions 300] [--raw 1000] [--answers 5000]
+        (écrit DOSSIER/JSON/*.json, DOSSIER/RAW TXT/SynthQ.txt + SynthR.txt, DOSSIER/question_stats.json)
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import zipfile
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backend
+
+QUESTIONS_PER_CHAPTER = 100
+WORDS = (
+    "injection intramusculaire sous-cutanée intraveineuse pression artérielle élevée diminuée "
+    "fréquence cardiaque débit rénal filtration glomérulaire hormone thyroïdienne insuline "
+    "glycémie cortisol œdème pulmonaire ventilation alvéolaire hémoglobine plaquettes "
+    "coagulation nerf vague muscle squelettique lisse potentiel membrane canal sodium "
+    "potassium calcium récepteur muscarinique nicotinique adrénaline noradrénaline"
+).split()
+
+
+def sentence(rng, words):
+    return " ".join(rng.choices(WORDS, k=words))
+
+
+def correct_letters(rng, num_options=5):
+    return sorted(rng.sample([chr(65 + i) for i in range(num_options)], rng.randint(1, 3)))
+
+
+def write_json_banks(json_dir, num_banks, questions_per_bank, seed=0):
+    """Écrit des banques au format du dossier JSON/ et retourne leurs chemins"""
+    rng = random.Random(seed)
+    os.makedirs(json_dir, exist_ok=True)
+    paths = []
+    for b in range(num_banks):
+        bank = [
+            {
+                "chapitre": i // QUESTIONS_PER_CHAPTER + 1,
+                "id": i + 1,
+                "question": f"Banque {b}, question {i} : {sentence(rng, 10)} ?",
+                "options": [sentence(rng, 6) for _ in range(5)],
+                "correct_answers": correct_letters(rng),
+            }
+            for i in range(questions_per_bank)
+        ]
+        path = os.path.join(json_dir, f"Synth{b:03d}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(bank, f, indent=4, ensure_ascii=False)
+        paths.append(path)
+    return paths
+
+
+def write_raw_bank(directory, num_questions, name="Synth", seed=0):
+    """Écrit un couple RAW TXT (NomQ.txt / NomR.txt, chapitres de 100 questions) et retourne leurs chemins"""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    q_path = os.path.join(directory, f"{name}Q.txt")
+    r_path = os.path.join(directory, f"{name}R.txt")
+    with open(q_path, "w", encoding="utf-8") as q_file, open(r_path, "w", encoding="utf-8") as r_file:
+        for n in range(num_questions):
+            number = n % QUESTIONS_PER_CHAPTER + 1
+            if number == 1:
+                chapter = f"Chapitre {n // QUESTIONS_PER_CHAPTER + 1}\n"
+                q_file.write(chapter)
+                r_file.write(chapter)
+            q_file.write(f"{number}. Question synthétique numéro {n} : {sentence(rng, 8)} :\n")
+            for letter in "abcde":
+                q_file.write(f"{letter}. {sentence(rng, 5)}\n")
+            q_file.write("\n")
+            r_file.write(f"{number}. {', '.join(correct_letters(rng))};\n")
+    return q_path, r_path
+
+
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+
+
+def write_docx_bank(path, num_questions, seed=0):
+    """Écrit un sujet Word minimal (.docx) au format des fichiers de Data/ : "N. question",
+    options numérotées "a." à "e.", puis "R : lettres". Seul word/document.xml est produit."""
+    rng = random.Random(seed)
+
+    def paragraph(text):
+        return f'<w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", DOCX_CONTENT_TYPES)
+        with archive.open("word/document.xml", "w") as document:
+            document.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                           b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                           b'<w:body>')
+            for n in range(num_questions):
+                block = [paragraph(f"{n + 1}. Question synthétique {n} : {sentence(rng, 8)}\xa0:")]
+                block += [paragraph(f"{letter}. {sentence(rng, 5)}\xa0;") for letter in "abcde"]
+                block.append(paragraph(f"R\xa0: {', '.join(c.lower() for c in correct_letters(rng))}"))
+                document.write("".join(block).encode("utf-8"))
+            document.write(b"</w:body></w:document>")
+    return path
+
+
+def synthetic_stats(question_keys, num_answers, accuracy=0.7, seed=0, start=1_700_000_000):
+    """Historique de réponses rejoué avec le planificateur : {clé: stats} comme question_stats.json"""
+    rng = random.Random(seed)
+    stats = {}
+    now = start
+    for _ in range(num_answers):
+        key = rng.choice(question_keys)
+        q_stats = stats.setdefault(key, {"correct": 0, "incorrect": 0})
+        backend.apply_answer(q_stats, rng.random() < accuracy, now)
+        backend.apply_latency(q_stats, rng.lognormvariate(2, 0.6))
+        now += rng.randint(5, 120)
+    return stats
+
+
+def write_stats_history(path, question_keys, num_answers, accuracy=0.7, seed=0):
+    """Écrit un instantané de stats (format StatsStore) et retourne le dictionnaire"""
+    stats = synthetic_stats(question_keys, num_answers, accuracy, seed)
+    backend.atomic_write_json(path, {"seq": 0, "stats": stats})
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out", help="dossier de sortie")
+    parser.add_argument("--banks", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=300, help="questions par banque JSON")
+    parser.add_argument("--raw", type=int, default=1000, help="questions du couple RAW TXT")
+    parser.add_argument("--answers", type=int, default=5000, help="réponses de l'historique de stats")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    json_dir = os.path.join(args.out, "JSON")
+    paths = write_json_banks(json_dir, args.banks, args.questions, args.seed)
+    write_raw_bank(os.path.join(args.out, "RAW TXT"), args.raw, seed=args.seed)
+    keys = [f"{path}|{i + 1}" for path in paths for i in range(args.questions)]
+    write_stats_history(os.path.join(args.out, backend.STATS_FILE), keys, args.answers, seed=args.seed)
+    print(f"{args.banks} banques JSON, {args.raw} questions RAW TXT, {args.answers} réponses dans {args.out}")
+
+
+if __name__ == "__main__":
+    main()
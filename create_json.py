@@ -1,6 +1,13 @@
 import re
 import os
+import sys
 import json
+import hashlib
+import time
+import argparse
+import zipfile
+from xml.etree.ElementTree import iterparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 class Question:
     def __init__(self, chapitre, id, question, options, correct_answers):
@@ -19,80 +26,359 @@ class Question:
             "correct_answers": self.correct_answers
         }
 
-def convert_to_uppercase_inplace(file):
-    with open(file, 'r+') as f:
-        text = f.read()
-        f.seek(0)
-        f.write(text.upper())
-        f.truncate()
+# Une question se reconnaît à son numéro en début de ligne ("12. Texte...")
+QUESTION_RE = re.compile(r'^(\d+)\.\s*(.*)')
+# Lettre d'option en tête de ligne ("a. texte", "B) texte"), retirée comme dans les banques JSON
+OPTION_RE = re.compile(r'^([a-eA-E])\s*[\.\)]\s*(.*)')
+# Nombre de lignes lues après une question pour former ses options
+OPTIONS_PER_QUESTION = 5
 
-def read_questions_and_answers(questions_filename, answers_filename):
-    stockllll = 0
-    questions = []
-    with open(questions_filename, 'r', encoding='utf-8') as q_file, open(answers_filename, 'r', encoding='utf-8') as a_file:
-        q_lines = q_file.readlines()
-        a_lines = a_file.readlines()
-
-        current_chapter = ""
-        answers = {}
-        for line in a_lines:
+def read_answers(answers_filename):
+    """Lit le fichier réponses et retourne {chapitre: [réponses brutes]}"""
+    answers = {}
+    current_chapter = ""
+    with open(answers_filename, 'r', encoding='utf-8') as a_file:
+        for line in a_file:
             if line.startswith("Chapitre"):
                 current_chapter = line.strip()
                 answers[current_chapter] = []
             elif line.strip() and current_chapter and line.strip()[0].isdigit():
                 answers[current_chapter].extend(line.strip().split(';')[:-1])
+    return answers
+
+def iter_questions(questions_filename, answers_filename):
+    """Générateur : lit le fichier questions ligne par ligne et produit les Question au fil de l'eau"""
+    answers = read_answers(answers_filename)
+
+    chapter_number = 0
+    current_chapter = ""
+    question_count = 0
+    # Questions dont on attend encore les options (les lignes qui suivent)
+    pending = []
+
+    with open(questions_filename, 'r', encoding='utf-8') as q_file:
+        for line in q_file:
+            if pending:
+                option = OPTION_RE.match(line.strip())
+                option_text = option.group(2) if option else line.strip()
+                for question in pending:
+                    question.options.append(option_text)
+                while pending and len(pending[0].options) == OPTIONS_PER_QUESTION:
+                    yield pending.pop(0)
 
-        current_chapter = ""
-        question_count = 0
-        for line in q_lines:
             if line.startswith("Chapitre"):
                 current_chapter = line.strip()
-                stockllll = stockllll + 1
+                chapter_number += 1
                 question_count = 0
             elif line.strip():
-                # Use regular expression to split the line into question number and question text
-                match = re.match(r'^(\d+)\.\s*(.*)', line)
+                match = QUESTION_RE.match(line)
                 if match:
                     question_number = int(match.group(1))
-                    question = match.group(2).strip()
-                    options = [q_lines[q_lines.index(line) + i].strip() for i in range(1, 6) if q_lines.index(line) + i < len(q_lines)]
+                    question_text = match.group(2).strip()
 
-                    if current_chapter in answers and question_number - 1 < len(answers[current_chapter]):
-                        correct_answers_raw = answers[current_chapter][question_number - 1].split('.')[1].strip()
+                    chapter_answers = answers.get(current_chapter)
+                    if chapter_answers is not None and question_number - 1 < len(chapter_answers):
+                        correct_answers_raw = chapter_answers[question_number - 1].split('.')[1].strip()
                         correct_answers = [i.strip() for i in correct_answers_raw.split(',') if i.strip()]
                     else:
                         correct_answers = []
 
-                    questions.append(Question(stockllll, question_count + 1, question, options, correct_answers))
                     question_count += 1
+                    pending.append(Question(chapter_number, question_count, question_text, [], correct_answers))
+
+    # Fin de fichier : les dernières questions gardent les options disponibles
+    yield from pending
+
+def read_questions_and_answers(questions_filename, answers_filename):
+    """Retourne la liste complète des questions (voir iter_questions)"""
+    return list(iter_questions(questions_filename, answers_filename))
+
+def read_plain_answers(answers_filename):
+    """Lit un fichier réponses "une ligne par question" (ex : "A, B, D")"""
+    with open(answers_filename, 'r', encoding='utf-8') as a_file:
+        for line in a_file:
+            # Supprime les sauts de ligne, les espaces et les virgules
+            yield list(line.strip().upper().replace(" ", "").replace(",", ""))
+
+def find_source_pairs(raw_dir):
+    """Retourne les couples (nom, fichier Q, fichier R) présents dans le dossier"""
+    pairs = []
+    for filename in sorted(os.listdir(raw_dir)):
+        if not filename.endswith("Q.txt"):
+            continue
+        name = filename[:-len("Q.txt")]
+        answers_path = os.path.join(raw_dir, f"{name}R.txt")
+        if os.path.exists(answers_path):
+            pairs.append((name, os.path.join(raw_dir, filename), answers_path))
+        else:
+            print(f"Fichier réponses manquant pour {filename}")
+    return pairs
+
+def convert_bank(questions_filename, answers_filename, output_filename):
+    """Convertit un couple Q/R en fichier JSON, retourne (nb questions, durée)"""
+    start = time.perf_counter()
+    questions = read_questions_and_answers(questions_filename, answers_filename)
+
+    # Sans en-têtes "Chapitre", le fichier R contient une ligne de réponses par question
+    if not any(q.correct_answers for q in questions):
+        for question, reponse in zip(questions, read_plain_answers(answers_filename)):
+            question.correct_answers = reponse
+
+    with open(output_filename, "w", encoding="utf-8") as f:
+        json.dump([q.to_dict() for q in questions], f, indent=4, ensure_ascii=False)
+
+    return len(questions), time.perf_counter() - start
+
+# --- IMPORT DIRECT DES SUJETS WORD (.docx) ---
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# "12. Texte", "*12. Texte" ou "12. * Texte" (l'astérisque marque une question à réponse unique)
+DOCX_QUESTION_RE = re.compile(r'^(\*?)\s*(\d+)\s*[\.\)]\s*(\*?)\s*(.*)')
+DOCX_ANSWER_RE = re.compile(r'^R\s*:\s*(.*)')
+
+def clean_docx_text(text):
+    """Espaces insécables, apostrophes typographiques et espaces multiples, comme dans les banques JSON"""
+    text = text.replace("\xa0", " ").replace("’", "'")
+    return re.sub(r'\s+', ' ', text).strip()
+
+def iter_docx_paragraphs(docx_path):
+    """Générateur : (texte, numéroté automatiquement) pour chaque paragraphe de word/document.xml.
+    Lecture en flux (iterparse) : les paragraphes traités sont libérés au fur et à mesure."""
+    with zipfile.ZipFile(docx_path) as archive, archive.open("word/document.xml") as xml_file:
+        body = None
+        table_depth = 0
+        parts = []
+        numbered = False
+        for event, element in iterparse(xml_file, events=("start", "end")):
+            tag = element.tag
+            if event == "start":
+                if tag == WORD_NS + "body":
+                    body = element
+                elif tag == WORD_NS + "tbl":
+                    table_depth += 1
+                elif tag == WORD_NS + "p":
+                    parts = []
+                    numbered = False
+                continue
+            if tag == WORD_NS + "t":
+                parts.append(element.text or "")
+            elif tag in (WORD_NS + "tab", WORD_NS + "br"):
+                parts.append(" ")
+            elif tag == WORD_NS + "numPr":
+                numbered = True
+            elif tag == WORD_NS + "tbl":
+                table_depth -= 1
+            elif tag == WORD_NS + "p":
+                yield clean_docx_text("".join(parts)), numbered
+                element.clear()
+                if body is not None and not table_depth:
+                    body.clear()
+
+def iter_docx_questions(docx_path):
+    """Générateur : Question pour chaque bloc "N. question / a.-e. options / R : lettres" du document.
+    Les options peuvent être écrites ("a. ...") ou numérotées automatiquement par Word."""
+    chapter_number = 0
+    question_count = 0
+    current = None
+
+    for text, numbered in iter_docx_paragraphs(docx_path):
+        if not text:
+            continue
+        if text.startswith("Chapitre"):
+            if current is not None:
+                yield current
+                current = None
+            chapter_number += 1
+            question_count = 0
+            continue
+
+        match = DOCX_QUESTION_RE.match(text)
+        expecting_options = current is not None and not current.correct_answers \
+            and len(current.options) < OPTIONS_PER_QUESTION
+        if match and not (numbered and expecting_options):
+            if current is not None:
+                yield current
+            star = "* " if match.group(1) or match.group(3) else ""
+            question_count += 1
+            current = Question(chapter_number, question_count, star + match.group(4), [], [])
+            continue
+
+        answer = DOCX_ANSWER_RE.match(text)
+        if answer and current is not None:
+            current.correct_answers = sorted({c.upper() for c in re.findall(r'[a-eA-E]', answer.group(1))})
+            yield current
+            current = None
+        elif current is not None and expecting_options:
+            option = None if numbered else OPTION_RE.match(text)
+            if not numbered and not option and not current.options:
+                # Énoncé sur plusieurs paragraphes
+                current.question = f"{current.question} {text}"
+                continue
+            option_text = option.group(2) if option else text
+            current.options.append(re.sub(r'\s*;$', '', option_text))
+
+    if current is not None:
+        yield current
+
+def convert_docx(docx_path, output_filename):
+    """Convertit un sujet Word (.docx) en fichier JSON, retourne (nb questions, durée)"""
+    start = time.perf_counter()
+    questions = list(iter_docx_questions(docx_path))
+    missing = [q.id for q in questions if not q.correct_answers]
+    if missing:
+        print(f"{os.path.basename(docx_path)} : pas de ligne \"R :\" pour les questions {missing}")
+    with open(output_filename, "w", encoding="utf-8") as f:
+        json.dump([q.to_dict() for q in questions], f, indent=4, ensure_ascii=False)
+    return len(questions), time.perf_counter() - start
+
+def find_docx_sources(data_dir):
+    """Retourne les couples (nom, fichier .docx) du dossier ; les .doc (Word 97) sont signalés"""
+    sources = []
+    for filename in sorted(os.listdir(data_dir)):
+        name, ext = os.path.splitext(filename)
+        if filename.startswith("~$"):
+            continue  # Fichier de verrouillage de Word
+        if ext.lower() == ".docx":
+            sources.append((name, os.path.join(data_dir, filename)))
+        elif ext.lower() == ".doc":
+            print(f"{filename} : format .doc (Word 97) non pris en charge, l'enregistrer en .docx")
+    return sources
+
+# Manifeste rangé dans le dossier JSON, sans extension .json pour ne pas être lu comme une banque
+MANIFEST_NAME = ".build_manifest"
+# Ancien emplacement (dossier RAW TXT), repris au premier lancement
+LEGACY_MANIFEST_NAME = ".build_manifest.json"
+
+def file_digest(path):
+    """Empreinte SHA-256 du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(manifest_path):
+    """Charge le manifeste de construction (empreintes des sources déjà converties)"""
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return {}
+
+def save_manifest(manifest_path, manifest):
+    """Écrit le manifeste de façon atomique (fichier temporaire + renommage)"""
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+def source_state(path, previous=None):
+    """Retourne l'état {sha256, mtime_ns, size} d'une source.
+    Le contenu n'est relu que si la date ou la taille ont changé."""
+    st = os.stat(path)
+    if previous and previous.get("mtime_ns") == st.st_mtime_ns and previous.get("size") == st.st_size:
+        return previous
+    return {"sha256": file_digest(path), "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+def is_foreign_output(entry, output_filename):
+    """Vrai si le JSON existe mais n'est pas (ou plus) celui produit par la dernière conversion :
+    banque faite à la main ou corrigée depuis l'application"""
+    if not os.path.exists(output_filename):
+        return False
+    if not entry or entry.get("output") != output_filename:
+        return True
+    return entry.get("output_sha256") != file_digest(output_filename)
 
-    return questions
+def is_up_to_date(entry, output_filename, sources):
+    """Vrai si le JSON existe et a été produit à partir de sources identiques"""
+    if not entry or entry.get("output") != output_filename or not os.path.exists(output_filename):
+        return False
+    previous = entry.get("sources", [])
+    return [s["sha256"] for s in sources] == [s.get("sha256") for s in previous]
 
-# Partie pour radio
-questions = read_questions_and_answers("Pharma4Q.txt", "Pharma4R.txt")
+def main(argv=None):
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Convertit tous les couples *Q.txt/*R.txt en banques JSON")
+    parser.add_argument("--raw-dir", default=os.path.join(base_dir, "RAW TXT"), help="dossier des fichiers sources")
+    parser.add_argument("--json-dir", default=os.path.join(base_dir, "JSON"), help="dossier de sortie")
+    parser.add_argument("--docx", nargs="?", const=os.path.join(base_dir, "Data"), metavar="DOSSIER",
+                        help="convertit aussi les sujets Word .docx du dossier (défaut : Data)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="nombre de processus (défaut : nb de coeurs)")
+    parser.add_argument("-f", "--force", action="store_true",
+                        help="reconvertit même les banques à jour et écrase les JSON modifiés à la main")
+    args = parser.parse_args(argv)
 
-input_file = "Pharma4R.txt"
-convert_to_uppercase_inplace(input_file)
+    # {nom: (fonction de conversion, fichiers sources)}
+    banks = {}
+    sources = []
+    if os.path.isdir(args.raw_dir):
+        sources += [(name, convert_bank, (q_path, r_path)) for name, q_path, r_path in find_source_pairs(args.raw_dir)]
+    if args.docx:
+        sources += [(name, convert_docx, (docx_path,)) for name, docx_path in find_docx_sources(args.docx)]
+    for name, convert, paths in sources:
+        if name in banks:
+            # Même fichier de sortie JSON/<nom>.json : la première source est gardée
+            print(f"{name} : {os.path.basename(paths[0])} ignoré, {os.path.basename(banks[name][1][0])} "
+                  f"produit déjà {name}.json")
+            continue
+        banks[name] = (convert, paths)
+    if not banks:
+        print(f"Aucune source trouvée dans {args.raw_dir}" + (f" ni dans {args.docx}" if args.docx else ""))
+        return 1
+    os.makedirs(args.json_dir, exist_ok=True)
 
-with open(input_file, "r") as f:
-    reponses = f.readlines()
+    start = time.perf_counter()
+    manifest_path = os.path.join(args.json_dir, MANIFEST_NAME)
+    legacy_manifest_path = os.path.join(args.raw_dir, LEGACY_MANIFEST_NAME)
+    if os.path.exists(manifest_path) or not os.path.exists(legacy_manifest_path):
+        legacy_manifest_path = None
+    manifest = load_manifest(legacy_manifest_path or manifest_path)
+    # Les banques non concernées par ce lancement (ex : .docx sans --docx) gardent leur entrée
+    new_manifest = {name: entry for name, entry in manifest.items() if name not in banks}
+    jobs = {}
+    for name, (convert, paths) in banks.items():
+        output_path = os.path.join(args.json_dir, f"{name}.json")
+        entry = manifest.get(name, {})
+        previous = entry.get("sources", [None] * len(paths))
+        sources = [source_state(path, prev) for path, prev in zip(paths, previous)]
+        if not args.force and is_up_to_date(entry, output_path, sources):
+            new_manifest[name] = dict(entry, sources=sources)
+            continue
+        if not args.force and is_foreign_output(entry, output_path):
+            print(f"{name} : {output_path} n'a pas été produit par create_json (ou a été modifié), "
+                  f"conservé ; --force pour l'écraser")
+            if entry:
+                new_manifest[name] = entry
+            continue
+        jobs[name] = (convert, (*paths, output_path))
+        new_manifest[name] = {"output": output_path, "sources": sources}
 
-for question, reponse in zip(questions, reponses):
-    # Supprime les sauts de ligne, les espaces et les virgules
-    reponse = reponse.strip().replace(" ", "").replace(",", "")
-    # Ajoute les réponses correctes à l'objet Question
-    question.correct_answers = list(reponse)
+    total_questions = 0
+    if jobs:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            futures = {executor.submit(convert, *job_args): name for name, (convert, job_args) in jobs.items()}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    count, elapsed = future.result()
+                except Exception as e:
+                    print(f"{name} : erreur ({e})")
+                    # On retentera la conversion au prochain lancement
+                    del new_manifest[name]
+                    continue
+                total_questions += count
+                new_manifest[name]["questions"] = count
+                new_manifest[name]["output_sha256"] = file_digest(new_manifest[name]["output"])
+                print(f"{name} : {count} questions en {elapsed:.3f} s")
 
-# Divisez les questions en 11 groupes en fonction de leur chapitre
-chapitres = set(q.chapitre for q in questions)
-groupes = {chapitre: [] for chapitre in chapitres}
-for question in questions:
-    groupes[question.chapitre].append(question)
+    if new_manifest != manifest or legacy_manifest_path:
+        save_manifest(manifest_path, new_manifest)
+    if legacy_manifest_path:
+        os.remove(legacy_manifest_path)
 
-# Pour chaque groupe de questions, écrivez les questions dans un fichier JSON séparé
-for chapitre, groupe in groupes.items():
-    nom_fichier = f"Nephro3(corrigé GPT).json"
-    with open(nom_fichier, "w") as f:
-        json.dump([q.to_dict() for q in groupe], f, indent=4)
+    print(f"{len(jobs)}/{len(banks)} banques converties ({total_questions} questions) en {time.perf_counter() - start:.3f} s")
+    return 0
 
-print("Nb questions cardio = " + str(len(questions)))
+if __name__ == "__main__":
+    sys.exit(main())
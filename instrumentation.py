@@ -0,0 +1,88 @@
+"""Instrumentation optionnelle des chemins critiques (chargement, sélection, affichage, écritures).
+
+Les fonctions marquées @hot_path ne sont pas modifiées : tant que enable() n'est pas
+appelé, le coût est nul. enable() les remplace par des versions chronométrées
+(nombre d'appels, temps total / moyen / max) et affiche un résumé à la sortie.
+
+Activation : QCM_INSTRUMENT=1 (et QCM_CPROFILE=fichier.prof pour cProfile),
+ou les options --instrument / --cprofile de QCM.py et server.py.
+"""
+import os
+import sys
+import time
+import atexit
+import functools
+import threading
+
+_hot_paths = []
+_timings = {}
+_lock = threading.Lock()
+_profiler = None
+enabled = False
+
+def hot_path(fn):
+    """Déclare une fonction (ou méthode) à chronométrer quand l'instrumentation est active"""
+    _hot_paths.append(fn)
+    return fn
+
+def _timed(fn, name):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            with _lock:
+                entry = _timings.get(name)
+                if entry is None:
+                    entry = _timings[name] = [0, 0.0, 0.0]
+                entry[0] += 1
+                entry[1] += elapsed
+                if elapsed > entry[2]:
+                    entry[2] = elapsed
+    return wrapper
+
+def enable(profile_path=None):
+    """Remplace les fonctions @hot_path par leurs versions chronométrées (une seule fois)"""
+    global enabled, _profiler
+    if enabled:
+        return
+    enabled = True
+    for fn in _hot_paths:
+        owner = sys.modules[fn.__module__]
+        *path, attr = fn.__qualname__.split(".")
+        for part in path:
+            owner = getattr(owner, part)
+        setattr(owner, attr, _timed(fn, fn.__qualname__))
+    if profile_path:
+        import cProfile
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    atexit.register(report, profile_path)
+
+def enable_from_env(instrument=False, profile_path=None):
+    """Active l'instrumentation si demandé (options de ligne de commande ou variables d'environnement)"""
+    profile_path = profile_path or os.environ.get("QCM_CPROFILE")
+    if instrument or profile_path or os.environ.get("QCM_INSTRUMENT", "") not in ("", "0"):
+        enable(profile_path)
+
+def snapshot():
+    """{nom: (appels, total_s, max_s)}"""
+    with _lock:
+        return {name: tuple(entry) for name, entry in _timings.items()}
+
+def report(profile_path=None, file=None):
+    """Affiche le résumé des temps (et écrit le profil cProfile si demandé)"""
+    file = file or sys.stderr
+    if _profiler is not None and profile_path:
+        _profiler.disable()
+        _profiler.dump_stats(profile_path)
+        print(f"Profil cProfile écrit dans {profile_path}", file=file)
+    timings = snapshot()
+    if not timings:
+        return
+    print(f"\n{'Chemin critique':45s} {'appels':>8s} {'total ms':>10s} {'moyen ms':>10s} {'max ms':>10s}", file=file)
+    for name, (count, total, worst) in sorted(timings.items(), key=lambda item: -item[1][1]):
+        print(f"{name:45s} {count:8d} {total * 1000:10.1f} {total / count * 1000:10.3f} {worst * 1000:10.1f}",
+              file=file)
@@ -0,0 +1,165 @@
+"""Recherche plein texte dans les questions et leurs options (index inversé).
+
+Les textes sont normalisés (minuscules, sans accents : "élevée" -> "elevee") puis
+découpés en mots. Chaque mot de la recherche est un préfixe : "intramus" trouve
+"intramusculaire". L'index est tenu à jour par backend.notify_question_edit, une fois
+chaque modification enregistrée.
+"""
+import re
+import bisect
+import heapq
+import itertools
+import unicodedata
+
+MIN_TOKEN_LENGTH = 2
+# Au-delà, un préfixe est considéré trop vague pour compter ses occurrences
+MAX_COUNTED_TERMS = 64
+TOKEN_RE = re.compile(rf"[a-z0-9]{{{MIN_TOKEN_LENGTH},}}")
+LIGATURES = (("œ", "oe"), ("æ", "ae"), ("ß", "ss"))
+
+def fold(text):
+    """Minuscules sans accents ni ligatures"""
+    text = str(text).lower()
+    if text.isascii():
+        return text
+    for ligature, replacement in LIGATURES:
+        text = text.replace(ligature, replacement)
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+def tokenize(text):
+    """Mots normalisés d'un texte (les mots d'une lettre sont ignorés)"""
+    return TOKEN_RE.findall(fold(text))
+
+class SearchIndex:
+    """Index inversé {mot: [uid]} sur les QuestionRecord (énoncé + options).
+
+    Listes triées par uid. Chaque question garde aussi sa suite de mots normalisés
+    (" mot1 mot2 ... ") : la recherche part du mot le plus rare et vérifie les autres
+    par sous-chaîne, sans ensemble de mots par question.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.questions = {}
+        self._texts = {}
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+        self._indexed_sources = set()
+
+    def __len__(self):
+        return len(self.questions)
+
+    # --- CONSTRUCTION ---
+    def add(self, question, question_text=None, options=None):
+        uid = question.uid
+        question_text = question.question if question_text is None else question_text
+        options = question.options if options is None else options
+        tokens = tokenize(" ".join([question_text, *options]))
+        self.questions[uid] = question
+        self._texts[uid] = f" {' '.join(tokens)} "
+        for token in set(tokens):
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = []
+                self._vocabulary_dirty = True
+            # Listes triées par uid (ordre des banques) : la recherche peut s'arrêter à `limit`
+            if posting and posting[-1] > uid:
+                bisect.insort(posting, uid)
+            else:
+                posting.append(uid)
+
+    def remove(self, question):
+        uid = question.uid
+        text = self._texts.pop(uid, None)
+        if text is None:
+            return
+        del self.questions[uid]
+        for token in set(text.split()):
+            posting = self.postings[token]
+            posting.remove(uid)
+            if not posting:
+                del self.postings[token]
+                self._vocabulary_dirty = True
+
+    def reindex(self, question, question_text=None, options=None):
+        """Remplace l'entrée d'une question modifiée"""
+        if getattr(question, "uid", None) not in self._texts:
+            return
+        self.remove(question)
+        self.add(question, question_text, options)
+
+    def index_chapters(self, chapters, chapter_files=None):
+        """Indexe les chapitres pas encore indexés (chargés à la demande si ChapterStore)"""
+        for _ in self.iter_index_chapters(chapters, chapter_files):
+            pass
+        return self
+
+    def iter_index_chapters(self, chapters, chapter_files=None, batch=250):
+        """Comme index_chapters, par lots : produit (chapitres indexés, total) tous les `batch`
+        questions et à chaque fin de chapitre, pour étaler la construction (ex : Tk after()).
+        Un générateur abandonné peut être relancé : les questions déjà indexées sont sautées."""
+        files = list(chapter_files if chapter_files is not None else chapters)
+        count = 0
+        for done, file_path in enumerate(files):
+            if file_path in self._indexed_sources:
+                continue
+            for question in chapters[file_path]:
+                if question.uid not in self._texts:
+                    self.add(question)
+                count += 1
+                if count % batch == 0:
+                    yield done, len(files)
+            self._indexed_sources.add(file_path)
+            yield done + 1, len(files)
+
+    # --- RECHERCHE ---
+    def _prefix_range(self, token):
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self.postings)
+            self._vocabulary_dirty = False
+        lo = bisect.bisect_left(self._vocabulary, token)
+        hi = bisect.bisect_left(self._vocabulary, token + "\uffff", lo)
+        return lo, hi
+
+    def search(self, query, limit=None):
+        """Questions contenant tous les mots de la recherche (en préfixe), dans l'ordre des banques"""
+        tokens = set(tokenize(query))
+        if not tokens or (limit is not None and limit <= 0):
+            return []
+
+        # On part du mot le plus sélectif (le moins d'occurrences, préfixe compris) ;
+        # les autres sont vérifiés sur le texte normalisé des seuls candidats.
+        best = None
+        for token in tokens:
+            lo, hi = self._prefix_range(token)
+            if hi == lo:
+                return []
+            if hi - lo <= MAX_COUNTED_TERMS:
+                cost = sum(len(self.postings[term]) for term in self._vocabulary[lo:hi])
+            else:
+                cost = len(self.questions) + hi - lo
+            if best is None or cost < best[0]:
+                best = (cost, lo, hi, token)
+        _, lo, hi, driver = best
+        needles = [" " + token for token in tokens if token != driver]
+        postings = [self.postings[term] for term in self._vocabulary[lo:hi]]
+        if len(postings) == 1:
+            candidates = postings[0]
+        elif not needles and limit is not None:
+            # Fusion paresseuse : on s'arrête dès `limit` résultats
+            candidates = (uid for uid, _ in itertools.groupby(heapq.merge(*postings)))
+        else:
+            candidates = sorted(set().union(*postings))
+
+        texts = self._texts
+        matches = []
+        for uid in candidates:
+            text = texts[uid]
+            for needle in needles:
+                if needle not in text:
+                    break
+            else:
+                matches.append(self.questions[uid])
+                if len(matches) == limit:
+                    break
+        return matches
@@ -0,0 +1,286 @@
+"""Serveur HTTP/JSON local : les banques sont chargées une fois et partagées entre les élèves.
+
+Usage : python server.py [--host 127.0.0.1] [--port 8765] [--stats-dir stats]
+
+Points d'entrée (corps et réponses en JSON, "user" identifie l'élève) :
+    GET  /chapters                     liste des chapitres
+    POST /select   {user, chapters?, count?}            questions prioritaires (sans les réponses)
+    POST /grade    {user, qid, answers, elapsed_ms?}    correction + mise à jour des stats de l'élève
+    GET  /errors?user=...                               questions ratées par l'élève (+ stats et temps de réponse)
+    GET  /search?q=...&limit=50                         recherche plein texte
+    POST /edit     {qid, question, options, correct_answers}
+"""
+import os
+import sys
+import json
+import asyncio
+import argparse
+from urllib.parse import urlsplit, parse_qs
+
+import backend
+import instrumentation
+from search_index import SearchIndex
+
+MAX_BODY = 1 << 20
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def int_param(value, name):
+    """Entier positif transmis par le client (corps JSON ou paramètre d'URL)"""
+    if isinstance(value, bool):
+        raise HTTPError(400, f"Paramètre '{name}' invalide")
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"Paramètre '{name}' invalide")
+    if value < 0:
+        raise HTTPError(400, f"Paramètre '{name}' invalide")
+    return value
+
+def string_list(value, name):
+    """Liste de chaînes transmise par le client"""
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise HTTPError(400, f"Paramètre '{name}' : liste de chaînes attendue")
+    return value
+
+class QuizServer:
+    """État partagé du serveur : banques en mémoire et stats isolées par élève"""
+
+    def __init__(self, json_dir, stats_dir):
+        self.stats_dir = stats_dir
+        os.makedirs(stats_dir, exist_ok=True)
+        self.persistence = backend.PersistenceWorker()
+        self.chapter_files, self.chapters = backend.load_chapters(json_dir)
+        # Toutes les banques sont chargées au démarrage : les requêtes ne touchent plus le disque
+        self.questions_by_uid = {}
+        self.chapter_names = {}
+        for file_path in self.chapter_files:
+            self.chapter_names[os.path.splitext(os.path.basename(file_path))[0]] = file_path
+            for question in self.chapters[file_path]:
+                self.questions_by_uid[question.uid] = question
+        self.user_stats = {}
+        self.search_index = SearchIndex().index_chapters(self.chapters, self.chapter_files)
+        backend.add_edit_listener(self.search_index.reindex)
+
+    # --- ÉTAT ---
+    def get_stats(self, user):
+        if not isinstance(user, str):
+            raise HTTPError(400, "Paramètre 'user' manquant")
+        stats = self.user_stats.get(user)
+        if stats is None:
+            try:
+                stats = backend.load_stats(writer=self.persistence, profile=user, stats_dir=self.stats_dir)
+            except ValueError:
+                raise HTTPError(400, "Paramètre 'user' invalide")
+            self.user_stats[user] = stats
+        return stats
+
+    def get_question(self, qid):
+        question = self.questions_by_uid.get(qid) if isinstance(qid, int) else None
+        if question is None:
+            raise HTTPError(404, "Question inconnue")
+        return question
+
+    @staticmethod
+    def public(question):
+        """Question telle qu'envoyée à l'élève (sans les réponses)"""
+        return {"qid": question.uid, "question": question.question, "options": list(question.options)}
+
+    def close(self):
+        for stats in self.user_stats.values():
+            stats.close()
+        self.persistence.close()
+
+    # --- POINTS D'ENTRÉE ---
+    def chapters_list(self, query, body):
+        return {"chapters": list(self.chapter_names)}
+
+    def select(self, query, body):
+        stats = self.get_stats(body.get("user"))
+        names = string_list(body.get("chapters", []), "chapters") or list(self.chapter_names)
+        candidates = []
+        for name in names:
+            file_path = self.chapter_names.get(name)
+            if file_path is None:
+                raise HTTPError(404, f"Chapitre inconnu : {name}")
+            candidates.extend(self.chapters[file_path])
+        count = int_param(body.get("count", 20), "count")
+        selected = backend.smart_select_questions(candidates, count, stats)
+        return {"questions": [self.public(q) for q in selected]}
+
+    def grade(self, query, body):
+        stats = self.get_stats(body.get("user"))
+        question = self.get_question(body.get("qid"))
+        answers = string_list(body.get("answers", []), "answers")
+        elapsed_ms = body.get("elapsed_ms")
+        elapsed = elapsed_ms / 1000 if isinstance(elapsed_ms, (int, float)) and elapsed_ms >= 0 else None
+        is_correct = sorted(question.correct_answers) == sorted(answers)
+        backend.record_answer(stats, question.key, is_correct, elapsed=elapsed)
+        return {"correct": is_correct, "correct_answers": list(question.correct_answers)}
+
+    @staticmethod
+    def latency(q_stats):
+        """Temps de réponse d'une question (secondes ; percentile au-delà de la dernière classe : null)"""
+        summary = backend.latency_summary(q_stats)
+        if summary is None:
+            return None
+        return {name: (None if value == float("inf") else value) for name, value in summary.items()}
+
+    def errors(self, query, body):
+        user = query.get("user", [body.get("user")])[0]
+        stats = self.get_stats(user)
+        return {"questions": [
+            dict(self.public(q), stats={"correct": stats[q.key]["correct"], "incorrect": stats[q.key]["incorrect"],
+                                        "latency": self.latency(stats[q.key])})
+            for q in backend.get_error_questions(self.chapters, stats)
+        ]}
+
+    def search(self, query, body):
+        text = query.get("q", [body.get("q", "")])[0]
+        if not isinstance(text, str):
+            raise HTTPError(400, "Paramètre 'q' invalide")
+        limit = int_param(query.get("limit", [body.get("limit", 50)])[0], "limit")
+        if limit < 1:
+            raise HTTPError(400, "Paramètre 'limit' invalide")
+        return {"questions": [self.public(q) for q in self.search_index.search(text, limit=limit)]}
+
+    def edit(self, query, body):
+        question = self.get_question(body.get("qid"))
+        new_q = body.get("question", "")
+        if not isinstance(new_q, str):
+            raise HTTPError(400, "Paramètre 'question' invalide")
+        new_q = new_q.strip()
+        new_opts = [o.strip() for o in string_list(body.get("options", []), "options") if o.strip()]
+        new_correct = string_list(body.get("correct_answers", []), "correct_answers")
+        if not new_q or not new_opts or not new_correct:
+            raise HTTPError(400, "Remplir tous les champs.")
+        letters = {chr(65 + i) for i in range(len(new_opts))}
+        if not set(new_correct) <= letters or len(set(new_correct)) != len(new_correct):
+            raise HTTPError(400, f"Réponses attendues parmi {', '.join(sorted(letters))}")
+        question.question, question.options, question.correct_answers = new_q, new_opts, new_correct
+        backend.queue_question_update(self.persistence, question, new_q, new_opts, new_correct)
+        return {"saved": True}
+
+    ROUTES = {
+        ("GET", "/chapters"): chapters_list,
+        ("POST", "/select"): select,
+        ("POST", "/grade"): grade,
+        ("GET", "/errors"): errors,
+        ("POST", "/errors"): errors,
+        ("GET", "/search"): search,
+        ("POST", "/edit"): edit,
+    }
+
+    def dispatch(self, method, target, body):
+        # Modifications écrites entre-temps : mise à jour de l'index de recherche
+        self.persistence.process_results()
+        url = urlsplit(target)
+        handler = self.ROUTES.get((method, url.path))
+        if handler is None:
+            raise HTTPError(404, "Route inconnue")
+        if body:
+            try:
+                body = json.loads(body)
+            except ValueError:
+                raise HTTPError(400, "JSON invalide")
+            if not isinstance(body, dict):
+                raise HTTPError(400, "Objet JSON attendu")
+        else:
+            body = {}
+        return handler(self, parse_qs(url.query), body)
+
+    # --- HTTP ---
+    @staticmethod
+    def content_length(headers):
+        """Taille du corps annoncée : 400 si invalide, 413 si au-delà de MAX_BODY"""
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise HTTPError(400, "En-tête Content-Length invalide")
+        if length < 0:
+            raise HTTPError(400, "En-tête Content-Length invalide")
+        if length > MAX_BODY:
+            raise HTTPError(413, "Corps de requête trop volumineux")
+        return length
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                try:
+                    length = self.content_length(headers)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                    # Corps non lu : la suite du flux n'est plus interprétable, on répond puis on ferme
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, payload = 200, self.dispatch(method, target, body)
+                    except HTTPError as e:
+                        status, payload = e.status, {"error": str(e)}
+                    except Exception as e:
+                        status, payload = 500, {"error": str(e)}
+
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(server, host, port):
+    tcp_server = await asyncio.start_server(server.handle_connection, host, port)
+    print(f"Serveur QCM sur http://{host}:{port} ({len(server.questions_by_uid)} questions)")
+    async with tcp_server:
+        await tcp_server.serve_forever()
+
+def main(argv=None):
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Serveur QCM HTTP/JSON local")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--json-dir", default=backend.get_json_dir(__file__))
+    parser.add_argument("--stats-dir", default=os.path.join(base_dir, "stats"), help="un profil de stats par élève")
+    parser.add_argument("--instrument", action="store_true", help="chronométrer les chemins critiques")
+    parser.add_argument("--cprofile", metavar="FICHIER", help="écrire un profil cProfile")
+    args = parser.parse_args(argv)
+    instrumentation.enable_from_env(args.instrument, args.cprofile)
+
+    server = QuizServer(args.json_dir, args.stats_dir)
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""Stockage SQLite des banques de questions (alternative aux fichiers JSON/).
+
+Activé avec la variable d'environnement QCM_STORAGE=sqlite : backend.load_chapters
+et backend.update_question_in_file passent alors par ce module.
+
+Usage : python sqlite_store.py import|export [--db questions.db] [--json-dir JSON]
+"""
+import os
+import sys
+import json
+import sqlite3
+import argparse
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS banks (
+    bank_id INTEGER PRIMARY KEY,
+    source_file TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER,
+    size INTEGER
+);
+CREATE TABLE IF NOT EXISTS questions (
+    bank_id INTEGER NOT NULL REFERENCES banks(bank_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    id,
+    chapitre,
+    question TEXT NOT NULL,
+    options TEXT NOT NULL,
+    correct_answers TEXT NOT NULL,
+    PRIMARY KEY (bank_id, position)
+);
+CREATE INDEX IF NOT EXISTS questions_by_id ON questions(bank_id, id);
+"""
+
+class SQLiteStore:
+    """Banques de questions dans une base SQLite (une ligne par question)"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        # Bases créées avant le suivi des fichiers JSON (date / taille)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(banks)")}
+        for column in ("mtime_ns", "size"):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE banks ADD COLUMN {column} INTEGER")
+
+    def close(self):
+        self.conn.close()
+
+    # --- LECTURE ---
+    def list_banks(self):
+        """Retourne les fichiers sources des banques, triés par nom"""
+        rows = self.conn.execute("SELECT source_file FROM banks").fetchall()
+        return sorted((r[0] for r in rows), key=os.path.basename)
+
+    def _bank_id(self, source_file):
+        row = self.conn.execute("SELECT bank_id FROM banks WHERE source_file = ?", (source_file,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _row_to_question(row, source_file):
+        q_id, chapitre, question, options, correct_answers = row
+        return {
+            "chapitre": chapitre, "id": q_id, "question": question,
+            "options": json.loads(options), "correct_answers": json.loads(correct_answers),
+            "source_file": source_file,
+        }
+
+    def load_bank(self, source_file):
+        """Retourne les questions d'une banque (dans l'ordre d'origine)"""
+        rows = self.conn.execute(
+            "SELECT q.id, q.chapitre, q.question, q.options, q.correct_answers"
+            " FROM questions q JOIN banks b ON b.bank_id = q.bank_id"
+            " WHERE b.source_file = ? ORDER BY q.position",
+            (source_file,),
+        )
+        return [self._row_to_question(row, source_file) for row in rows]
+
+    # --- ÉCRITURE ---
+    def update_question(self, source_file, q_id, new_q, new_opts, new_correct):
+        """Modifie une seule ligne, retourne True si la question existe"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "UPDATE questions SET question = ?, options = ?, correct_answers = ?"
+                " WHERE rowid = (SELECT q.rowid FROM questions q JOIN banks b ON b.bank_id = q.bank_id"
+                " WHERE b.source_file = ? AND q.id = ? ORDER BY q.position LIMIT 1)",
+                (new_q, json.dumps(new_opts, ensure_ascii=False), json.dumps(new_correct, ensure_ascii=False),
+                 source_file, q_id),
+            )
+        return cursor.rowcount > 0
+
+    def import_bank(self, source_file, chapter_data, mtime_ns=None, size=None):
+        """Remplace (ou crée) une banque à partir de sa liste de questions JSON.
+        mtime_ns / size : état du fichier importé, pour ne le réimporter que s'il change."""
+        with self.conn:
+            bank_id = self._bank_id(source_file)
+            if bank_id is None:
+                bank_id = self.conn.execute(
+                    "INSERT INTO banks (source_file, mtime_ns, size) VALUES (?, ?, ?)",
+                    (source_file, mtime_ns, size),
+                ).lastrowid
+            else:
+                self.conn.execute("UPDATE banks SET mtime_ns = ?, size = ? WHERE bank_id = ?",
+                                  (mtime_ns, size, bank_id))
+                self.conn.execute("DELETE FROM questions WHERE bank_id = ?", (bank_id,))
+            self.conn.executemany(
+                "INSERT INTO questions (bank_id, position, id, chapitre, question, options, correct_answers)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (bank_id, position, q.get("id"), q.get("chapitre"), q.get("question", ""),
+                     json.dumps(q.get("options", []), ensure_ascii=False),
+                     json.dumps(q.get("correct_answers", []), ensure_ascii=False))
+                    for position, q in enumerate(chapter_data)
+                ),
+            )
+
+    def import_json_file(self, file_path):
+        """Importe un fichier .json, retourne son nombre de questions"""
+        st = os.stat(file_path)
+        with open(file_path, "r", encoding="utf-8") as f:
+            chapter_data = json.load(f)
+        self.import_bank(file_path, chapter_data, st.st_mtime_ns, st.st_size)
+        return len(chapter_data)
+
+    def import_json_dir(self, json_dir):
+        """Importe tous les fichiers .json du dossier, retourne le nombre de questions"""
+        total = 0
+        for filename in sorted(os.listdir(json_dir)):
+            if filename.endswith(".json"):
+                total += self.import_json_file(os.path.abspath(os.path.join(json_dir, filename)))
+        return total
+
+    def sync_json_dir(self, json_dir):
+        """Importe les fichiers .json nouveaux ou modifiés depuis leur import (date ou taille),
+        retourne les fichiers importés. Une banque réimportée remplace ses éditions en base."""
+        known = {
+            source_file: (mtime_ns, size)
+            for source_file, mtime_ns, size in self.conn.execute("SELECT source_file, mtime_ns, size FROM banks")
+        }
+        imported = []
+        for filename in sorted(os.listdir(json_dir)):
+            if not filename.endswith(".json"):
+                continue
+            file_path = os.path.abspath(os.path.join(json_dir, filename))
+            st = os.stat(file_path)
+            if known.get(file_path) == (st.st_mtime_ns, st.st_size):
+                continue
+            try:
+                self.import_json_file(file_path)
+            except (OSError, ValueError) as e:
+                print(f"Erreur import {filename}: {e}")
+                continue
+            imported.append(file_path)
+        return imported
+
+    def export_json_dir(self, out_dir):
+        """Réécrit chaque banque au format JSON habituel, retourne le nombre de questions"""
+        os.makedirs(out_dir, exist_ok=True)
+        total = 0
+        for source_file in self.list_banks():
+            chapter_data = self.load_bank(source_file)
+            for question in chapter_data:
+                del question["source_file"]
+            with open(os.path.join(out_dir, os.path.basename(source_file)), "w", encoding="utf-8") as f:
+                json.dump(chapter_data, f, indent=4, ensure_ascii=False)
+            total += len(chapter_data)
+        return total
+
+def main(argv=None):
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Import/export des banques entre JSON/ et SQLite")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("--db", default=os.path.join(base_dir, "questions.db"), help="base SQLite")
+    parser.add_argument("--json-dir", default=os.path.join(base_dir, "JSON"), help="dossier des banques JSON")
+    args = parser.parse_args(argv)
+
+    store = SQLiteStore(args.db)
+    try:
+        if args.action == "import":
+            count = store.import_json_dir(args.json_dir)
+            print(f"{count} questions importées dans {args.db}")
+        else:
+            count = store.export_json_dir(args.json_dir)
+            print(f"{count} questions exportées dans {args.json_dir}")
+    finally:
+        store.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())